@@ -1,2 +1,2 @@
-from .healthcare import HEALTHCARE_PIPELINE, HEALTHCARE_DATA
-from .adult import ADULT_PIPELINE, ADULT_DATA
+from .healthcare import HEALTHCARE_PIPELINE, HEALTHCARE_SCHEMA
+from .adult import ADULT_PIPELINE, ADULT_SCHEMA
@@ -2,8 +2,15 @@ from importlib.resources import read_text, path
 
 import pandas as pd
 
+from ..schema import LazySchema
+
 
 ADULT_PIPELINE = read_text(__name__, "adult.py")
 
-with path(__name__, "train.csv") as train_path:
-    ADULT_DATA = pd.read_csv(train_path, na_values='?', index_col=0)
+
+def _read_adult_data(nrows):
+    with path(__name__, "train.csv") as train_path:
+        return pd.read_csv(train_path, na_values='?', index_col=0, nrows=nrows)
+
+
+ADULT_SCHEMA = LazySchema(_read_adult_data)
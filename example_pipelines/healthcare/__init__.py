@@ -2,13 +2,20 @@ from importlib.resources import read_text, path
 
 import pandas as pd
 
+from ..schema import LazySchema
+
 
 HEALTHCARE_PIPELINE = read_text(__name__, "healthcare.py")
 
-with path(__name__, "patients.csv") as patients_path:
-    patients = pd.read_csv(patients_path, na_values='?')
 
-with path(__name__, "histories.csv") as histories_path:
-    histories = pd.read_csv(histories_path, na_values='?')
+def _read_healthcare_data(nrows):
+    with path(__name__, "patients.csv") as patients_path:
+        patients = pd.read_csv(patients_path, na_values='?', nrows=nrows)
+
+    with path(__name__, "histories.csv") as histories_path:
+        histories = pd.read_csv(histories_path, na_values='?', nrows=nrows)
+
+    return patients.merge(histories, on=['ssn'])
+
 
-HEALTHCARE_DATA = patients.merge(histories, on=['ssn'])
+HEALTHCARE_SCHEMA = LazySchema(_read_healthcare_data)
@@ -0,0 +1,25 @@
+"""
+Lazily loaded schemas of the data of the example pipelines.
+"""
+import threading
+
+
+class LazySchema:
+    """
+    Column names of a dataset, read when first requested.
+
+    `read_frame(nrows)` reads the first nrows rows of the dataset, the columns are taken from
+    a header-only read.
+    """
+
+    def __init__(self, read_frame):
+        self._read_frame = read_frame
+        self._columns = None
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        with self._lock:
+            if self._columns is None:
+                self._columns = self._read_frame(0).columns
+            return self._columns
@@ -3,6 +3,7 @@ import dash_bootstrap_components as dbc
 
 from .layout import create_layout
 from .callbacks import create_callbacks
+from .util import JOB_MANAGER
 
 
 EXTERNAL_STYLESHEETS = [
@@ -38,8 +39,11 @@ def create_app():
 
     app.config.suppress_callback_exceptions = True
 
-    app.layout = create_layout()
+    app.layout = create_layout
 
     create_callbacks(app)
 
+    # Import the heavy modules for pipeline execution in the background before the first request
+    JOB_MANAGER.warm_up()
+
     return app
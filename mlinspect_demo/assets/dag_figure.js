@@ -0,0 +1,155 @@
+// Plotly figure of the DAG, built in the browser from the compact graph description of
+// util.build_graph_data: columnar node arrays, edges as arrays of parent and child node IDs and problem node IDs.
+// Adapted from: https://chart-studio.plotly.com/~empet/14007/graphviz-networks-plotted-with-plotly/#/
+
+var NODE_COLOR = 'rgb(200,200,200)';
+var NODE_LINE_COLOR = 'black';
+var PROBLEM_NODE_COLOR = 'red';
+
+// Edges with arrowheads in their middle, where the node markers do not hide them.
+// From util/addEdge.py (https://github.com/redransil/plotly-dirgraph) with
+// length_frac=1, arrow_pos='middle', arrow_length=15, arrow_angle=25, dot_size=20
+function edgeCoordinates(graph) {
+    var arrowLength = 15;
+    var arrowAngle = 25 * Math.PI / 180;
+    var convertedDotDiameter = 20 * .0565 / 20;
+    var parents = graph.edges[0];
+    var children = graph.edges[1];
+    var edgeX = [];
+    var edgeY = [];
+    for (var i = 0; i < parents.length; i++) {
+        var x0 = graph.x[parents[i]], y0 = graph.y[parents[i]];
+        var x1 = graph.x[children[i]], y1 = graph.y[children[i]];
+
+        // Incorporate the fraction of this segment covered by a dot into total reduction
+        var length = Math.hypot(x1 - x0, y1 - y0);
+        var fraction = 1 - (length > 0 ? convertedDotDiameter / length : 0);
+        var skipX = (x1 - x0) * (1 - fraction);
+        var skipY = (y1 - y0) * (1 - fraction);
+        x0 += skipX / 2;
+        x1 -= skipX / 2;
+        y0 += skipY / 2;
+        y1 -= skipY / 2;
+        // null prevents a line being drawn from end of this edge to start of next edge
+        edgeX.push(x0, x1, null);
+        edgeY.push(y0, y1, null);
+
+        var pointX = x0 + (x1 - x0) / 2;
+        var pointY = y0 + (y1 - y0) / 2;
+        var eta = y1 !== y0 ? Math.atan((x1 - x0) / (y1 - y0)) : Math.PI / 2;
+        var multiplier = y1 !== y0 ? Math.sign(y1 - y0) : 1;
+        [eta + arrowAngle, eta - arrowAngle].forEach(function(angle) {
+            edgeX.push(pointX, pointX - multiplier * arrowLength * Math.sin(angle), null);
+            edgeY.push(pointY, pointY - multiplier * arrowLength * Math.cos(angle), null);
+        });
+    }
+    return [edgeX, edgeY];
+}
+
+function buildDagFigure(graph) {
+    var scatter = graph.large ? 'scattergl' : 'scatter';
+    var problems = new Set(graph.problems);
+    var labels = [], pointData = [], colors = [], lineColors = [], annotations = [];
+    for (var i = 0; i < graph.x.length; i++) {
+        var operatorType = graph.operator_types[graph.types[i]];
+        var codeReference = graph.code_references[i];
+        // From mlinspect.visualisation._visualisation, like util._get_new_node_label
+        labels.push((operatorType[0] + ' (L' + codeReference[0] + ')\n' + graph.descriptions[i]).trim());
+        // Node ID and code reference, see the hover and select callbacks
+        pointData.push([i, JSON.stringify({
+            lineno: codeReference[0],
+            col_offset: codeReference[1],
+            end_lineno: codeReference[2],
+            end_col_offset: codeReference[3],
+        })]);
+        colors.push(problems.has(i) ? PROBLEM_NODE_COLOR : NODE_COLOR);
+        lineColors.push(problems.has(i) ? PROBLEM_NODE_COLOR : NODE_LINE_COLOR);
+        annotations.push({
+            x: graph.x[i],
+            y: graph.y[i],
+            text: operatorType[1],
+            showarrow: false,
+            font: {size: 16},
+            // Large DAGs are annotated once the user zooms in, see annotationsVisible
+            visible: !graph.large,
+        });
+    }
+
+    var edges = edgeCoordinates(graph);
+    var layout = {
+        font: {family: 'Courier New', color: 'black'},
+        width: 500,
+        height: 500,
+        showlegend: false,
+        xaxis: {visible: false},
+        yaxis: {visible: false},
+        margin: {l: 1, r: 1, b: 1, t: 1, pad: 1},
+        hovermode: 'closest',
+        plot_bgcolor: 'white',
+        clickmode: 'event+select',
+        annotations: annotations,
+        // Keeps the zoom when only the annotations change, and resets it for a new DAG
+        uirevision: Date.now(),
+    };
+    if (graph.large) {
+        layout.meta = {annotation_max_range: graph.annotation_max_range};
+    }
+    return {
+        data: [
+            {
+                type: scatter, x: edges[0], y: edges[1], mode: 'lines', hoverinfo: 'none',
+                line: {color: 'rgb(160,160,160)', width: 0.75},
+            },
+            {
+                type: scatter, x: graph.x, y: graph.y, mode: 'markers', name: '', hoverinfo: 'text', text: labels,
+                customdata: pointData,
+                marker: {size: 20, color: colors, line: {color: lineColors, width: 0.5}},
+            },
+        ],
+        layout: layout,
+    };
+}
+
+// Level of detail of large DAGs, see util/large_dag.py: whether the annotations of the nodes are
+// shown after the zoom in relayoutData, i.e. the visible x range is narrower than
+// layout.meta.annotation_max_range, or undefined if the x range did not change
+function annotationsVisible(layout, relayoutData) {
+    if (!layout.meta || layout.meta.annotation_max_range === undefined) {
+        return undefined;
+    }
+    if (relayoutData['xaxis.autorange']) {
+        return false;
+    }
+    var range = relayoutData['xaxis.range'] || [relayoutData['xaxis.range[0]'], relayoutData['xaxis.range[1]']];
+    if (range[0] === undefined || range[1] === undefined) {
+        return undefined;
+    }
+    return (range[1] - range[0]) <= layout.meta.annotation_max_range;
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dag: {
+        build_figure: function(graph, relayoutData, figure) {
+            var no_update = window.dash_clientside.no_update;
+            var triggered = window.dash_clientside.callback_context.triggered.map(function(trigger) {
+                return trigger.prop_id;
+            });
+            if (triggered.indexOf('dag.relayoutData') < 0) {
+                return graph ? buildDagFigure(graph) : no_update;
+            }
+            if (!relayoutData || !figure || !figure.layout || !figure.layout.annotations
+                    || figure.layout.annotations.length === 0) {
+                return no_update;
+            }
+            var visible = annotationsVisible(figure.layout, relayoutData);
+            if (visible === undefined || figure.layout.annotations[0].visible === visible) {
+                return no_update;
+            }
+            var annotations = figure.layout.annotations.map(function(annotation) {
+                return Object.assign({}, annotation, {visible: visible});
+            });
+            var layout = Object.assign({}, figure.layout, {annotations: annotations});
+            return Object.assign({}, figure, {layout: layout});
+        },
+    },
+});
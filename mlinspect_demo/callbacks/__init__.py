@@ -1,32 +1,69 @@
 import json
 
 import dash
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State, MATCH
 
-from dataclasses_serialization.json import JSONSerializer
-
-from example_pipelines import HEALTHCARE_DATA, ADULT_DATA
+from example_pipelines import HEALTHCARE_SCHEMA, ADULT_SCHEMA
 from ..layout import CODE_FONT, STYLE_HIDDEN, STYLE_SHOWN
-from ..util import execute_inspector_builder, build_graph_object, highlight_problem_nodes, get_result_summary, get_result_details
+from ..util import reevaluate_checks, render_execution, render_static_dag, get_result_summary, \
+    get_cached_result_details, prerender_problem_details, get_result_table, format_table_page, \
+    get_histogram_distribution, create_distribution_histogram_figure, \
+    get_no_bias_check_result, create_threshold_sweep_heatmap, execution_cache_key, expanded_cache_key, \
+    normalize_pipeline, preview_settings, RESULT_CACHE, SESSION_STORE, JOB_MANAGER, CHECKPOINT_POOL
+from ..util.threshold_sweep import threshold_grid
+from ..util.incremental import execute_incrementally
+from ..util.jobs import DONE, FAILED, JobQueueFull
+from ..util.large_dag import SuperNode
+from ..util.progress import OUTPUT, OPERATOR
+
+
+# Session fields to reset when the results are shown instead of the static DAG preview
+_HIDE_STATIC_DAG = {"static_pipeline": None, "static_pos_dict": None, "static_node_index": None}
+
+
+def _session_execution(session):
+    """The execution shown in the session, or None if there is none or it was evicted from the result cache."""
+    if session.execution_key is None:
+        return None
+    return RESULT_CACHE.get(session.execution_key)
 
 
 def create_callbacks(app):
     _update_pipeline_text(app)
     _show_hide_elements(app)
     _execute(app)
+    _sweep_thresholds(app)
     _interact_with_dag(app)
+    _paginate_result_tables(app)
+    _show_full_histograms(app)
 
 
 def _update_pipeline_text(app):
     app.clientside_callback(
         """
-        function(n_clicks) {
+        function(n_clicks, preview_clicks) {
             var editor = document.querySelector('#pipeline-textarea');
             return editor.value;
         }
         """,
         Output('clientside-pipeline-code', 'children'),
-        Input("execute", "n_clicks")
+        Input("execute", "n_clicks"),
+        Input("preview", "n_clicks"),
+    )
+
+    app.clientside_callback(
+        """
+        function(n_intervals, typed_code) {
+            var editor = document.querySelector('#pipeline-textarea');
+            if (!editor || editor.value === typed_code) {
+                return window.dash_clientside.no_update;
+            }
+            return editor.value;
+        }
+        """,
+        Output("clientside-typed-code", "children"),
+        Input("pipeline-typing-poll", "n_intervals"),
+        State("clientside-typed-code", "children"),
     )
 
     app.clientside_callback(
@@ -80,9 +117,9 @@ def _update_pipeline_text(app):
         elem_id = ctx.triggered[0]["prop_id"].split(".")[0]
 
         if elem_id == "healthcare-pipeline":
-            columns = HEALTHCARE_DATA.columns
+            columns = HEALTHCARE_SCHEMA.columns
         elif elem_id == "adult-pipeline":
-            columns = ADULT_DATA.columns
+            columns = ADULT_SCHEMA.columns
         else:
             columns = []
 
@@ -92,14 +129,17 @@ def _update_pipeline_text(app):
 
 def _show_hide_elements(app):
     @app.callback(
-        Output("histogram-sensitive-columns", "style"),
+        [
+            Output("histogram-sensitive-columns", "style"),
+            Output("histogram-max-error", "style"),
+        ],
         Input("histogramforcolumns-checkbox", "checked"),
     )
     def on_histogramforcolumns_checked(checked):
         """Show checklist of sensitive columns if HistogramForColumns is selected."""
         if checked:
-            return {**STYLE_SHOWN, **CODE_FONT}
-        return STYLE_HIDDEN
+            return {**STYLE_SHOWN, **CODE_FONT}, STYLE_SHOWN
+        return STYLE_HIDDEN, STYLE_HIDDEN
 
     @app.callback(
         Output("rowlineage-num-rows", "style"),
@@ -126,14 +166,15 @@ def _show_hide_elements(app):
             Output("nobiasintroduced-ratio-threshold", "style"),
             Output("nobiasintroduced-probability-threshold", "style"),
             Output("nobiasintroduced-sensitive-columns", "style"),
+            Output("nobiasintroduced-sweep-container", "style"),
         ],
         Input("nobiasintroduced-checkbox", "checked"),
     )
     def on_nobiasintroduced_checked(checked):
         """Show checklist of sensitive columns if NoBiasIntroducedFor is selected."""
         if checked:
-            return STYLE_SHOWN, STYLE_SHOWN, {**STYLE_SHOWN, **CODE_FONT}
-        return STYLE_HIDDEN, STYLE_HIDDEN, STYLE_HIDDEN
+            return STYLE_SHOWN, STYLE_SHOWN, {**STYLE_SHOWN, **CODE_FONT}, STYLE_SHOWN
+        return STYLE_HIDDEN, STYLE_HIDDEN, STYLE_HIDDEN, STYLE_HIDDEN
 
     @app.callback(
         Output("noillegalfeatures-additionalnames", "style"),
@@ -155,22 +196,74 @@ def _show_hide_elements(app):
 
 
 def _execute(app):
-    @app.callback(
+    # The server sends a compact description of the DAG, see util.build_graph_data. Zooming into
+    # a large DAG shows the annotations of its nodes
+    app.clientside_callback(
+        ClientsideFunction(namespace="dag", function_name="build_figure"),
+        Output("dag", "figure"),
+        Input("dag-graph", "data"),
+        Input("dag", "relayoutData"),
+        State("dag", "figure"),
+    )
+
+    # The output of running jobs is sent in parts, {"text": ..., "offset": ...} is appended if the shown
+    # output has that length, {"text": ...} replaces it
+    app.clientside_callback(
+        """
+        function(update, output, length) {
+            var no_update = window.dash_clientside.no_update;
+            if (!update) {
+                return [no_update, no_update];
+            }
+            if (update.offset === undefined) {
+                return [update.text, update.text.length];
+            }
+            if (update.offset !== (length || 0)) {
+                return [no_update, no_update];
+            }
+            output = (output || "") + update.text;
+            return [output, output.length];
+        }
+        """,
         [
-            # Output("inspector-result", "data"),
-            # Output("pos-dict", "data"),
-            Output("dag", "figure"),
             Output("pipeline-output", "children"),
+            Output("pipeline-output-length", "data"),
+        ],
+        [Input("pipeline-output-update", "data")],
+        [
+            State("pipeline-output", "children"),
+            State("pipeline-output-length", "data"),
+        ],
+    )
+
+    @app.callback(
+        [
+            Output("dag-graph", "data"),
+            Output("pipeline-output-update", "data"),
             Output("pipeline-output-container", "hidden"),
             Output("dag", "selectedData"),
             Output("results-summary", "children"),
+            Output("job-poll", "disabled"),
+            Output("job-status", "children"),
+            Output("cancel", "disabled"),
         ],
         Input("execute", "n_clicks"),
         Input("clientside-pipeline-code", "children"),
+        Input("job-poll", "n_intervals"),
+        Input("cancel", "n_clicks"),
+        Input("preview", "n_clicks"),
+        Input("clientside-typed-code", "children"),
+        Input("dag-expand", "data"),
         state=[
+            State("session-id", "data"),
+            State("pipeline-output-length", "data"),
+            # Whether 'preview' was clicked last
+            State("execute", "n_clicks_timestamp"),
+            State("preview", "n_clicks_timestamp"),
             # HistogramForColumns
             State("histogramforcolumns-checkbox", "checked"),
             State("histogram-sensitive-columns", "value"),
+            State("histogram-max-error", "value"),
             # RowLineage
             State("rowlineage-checkbox", "checked"),
             State("rowlineage-num-rows", "value"),
@@ -190,9 +283,10 @@ def _execute(app):
             State("nomissingembeddings-threshold", "value"),
         ]
     )
-    def on_execute(execute_clicks, pipeline,
+    def on_execute(execute_clicks, pipeline, poll_intervals, cancel_clicks, preview_clicks, typed_pipeline, expand,
+                   session_id, output_length, execute_timestamp, preview_timestamp,
                    # Inspections
-                   histogramforcolumns, histogramforcolumns_sensitive_columns,
+                   histogramforcolumns, histogramforcolumns_sensitive_columns, histogramforcolumns_max_error,
                    rowlineage, rowlineage_num_rows,
                    materializefirstoutputrows, materializefirstoutputrows_num_rows,
                    # Checks
@@ -202,10 +296,30 @@ def _execute(app):
                    nomissingembeddings, nomissingembeddings_threshold):
         """
         When user clicks 'execute' button, show extracted DAG including potential
-        problem nodes in red.
+        problem nodes in red. The 'preview' button does the same on stratified samples
+        of the input data, see util/sampling.py.
+
+        The pipeline is executed in a worker process, this callback is then triggered
+        by the 'job-poll' interval until the execution is finished. Until then, and
+        while user is typing, a static preview of the DAG is shown. Selecting a collapsed
+        Pipeline or ColumnTransformer of a large DAG expands it, see util/large_dag.py.
         """
-        if not execute_clicks or not pipeline:
-            return [dash.no_update]*5
+        # Enabled inspections and checks, to pre-render the details of problem nodes with
+        inspections_and_checks = (histogramforcolumns, rowlineage, materializefirstoutputrows,
+                                  nobiasintroduced, noillegalfeatures, nomissingembeddings)
+        ctx = dash.callback_context
+        elem_id = ctx.triggered[0]["prop_id"].split(".")[0] if ctx.triggered else None
+        if elem_id == "job-poll":
+            return _on_job_progress(session_id, output_length, inspections_and_checks)
+        if elem_id == "cancel":
+            return _on_job_cancel(session_id, output_length)
+        if elem_id == "clientside-typed-code":
+            return _on_pipeline_typed(session_id, typed_pipeline)
+        if elem_id == "dag-expand":
+            return _on_dag_node_expand(session_id, expand, nobiasintroduced_sensitive_columns)
+
+        if not (execute_clicks or preview_clicks) or not pipeline:
+            return [dash.no_update]*8
 
         ### Execute pipeline and inspections
         # [RowLineage, MaterializeFirstOutputRows] set default num rows to 5
@@ -216,6 +330,10 @@ def _execute(app):
             rowlineage_num_rows = max(rowlineage_num_rows, materializefirstoutputrows_num_rows)
         # [RowLineage, MaterializeFirstOutputRows] don't include MaterializeFirstOutputRows if RowLineage also checked
         materializefirstoutputrows = materializefirstoutputrows and not rowlineage
+        # [HistogramForColumns] approximate histograms if a maximum error is given
+        if histogramforcolumns_max_error:
+            # convert percentage to decimal
+            histogramforcolumns_max_error = histogramforcolumns_max_error/100.
         # [NoBiasIntroducedFor]
         if nobiasintroduced_ratio_threshold:
             # convert percentage to decimal
@@ -236,7 +354,12 @@ def _execute(app):
         nomissingembeddings_threshold = nomissingembeddings_threshold or 10
         # construct arguments for inspector builder
         inspections = {
-            "HistogramForColumns": (histogramforcolumns, [histogramforcolumns_sensitive_columns]),
+            "HistogramForColumns": (histogramforcolumns and not histogramforcolumns_max_error,
+                                    [histogramforcolumns_sensitive_columns]),
+            "ApproximateHistogramForColumns": (histogramforcolumns and bool(histogramforcolumns_max_error), [
+                histogramforcolumns_sensitive_columns,
+                histogramforcolumns_max_error,
+            ]),
             "RowLineage": (rowlineage, [rowlineage_num_rows or 5]),
             "MaterializeFirstOutputRows": (materializefirstoutputrows,
                                         [materializefirstoutputrows_num_rows or 5]),
@@ -250,75 +373,271 @@ def _execute(app):
             "NoIllegalFeatures": (noillegalfeatures, [noillegalfeatures_additional_names]),
             "NoMissingEmbeddings": (nomissingembeddings, [nomissingembeddings_threshold]),
         }
-        pipeline_output = execute_inspector_builder(pipeline, checks, inspections)
-        hide_output = False
-
-        ### Convert extracted DAG into plotly figure
-        from ..util import INSPECTOR_RESULT
-        figure = build_graph_object(INSPECTOR_RESULT.dag)
-
-        ### Highlight problematic nodes
-        figure = highlight_problem_nodes(figure, nobiasintroduced_sensitive_columns)
-
-        ### De-select any DAG nodes and trigger callback to reset details div
-        selected_data = {}
-
-        ### Summary check results
-        if INSPECTOR_RESULT.check_to_check_results:
-            summary = get_result_summary()
+        # [Preview] stratify samples on the sensitive columns of the enabled inspections and checks
+        if (preview_timestamp or 0) > (execute_timestamp or 0):
+            preview = sorted(set((histogramforcolumns and histogramforcolumns_sensitive_columns or [])
+                                 + (nobiasintroduced and nobiasintroduced_sensitive_columns or [])))
         else:
-            summary = dash.no_update
+            preview = None
+        cache_key = execution_cache_key(pipeline, checks, inspections, preview)
+        execution = RESULT_CACHE.get(cache_key)
+        if execution is not None:
+            SESSION_STORE.update(session_id, execution_key=cache_key, **_HIDE_STATIC_DAG)
+            return _execution_outputs(execution, inspections_and_checks)
+
+        ### Only check parameters changed: re-evaluate checks on the annotations of the last execution
+        session = SESSION_STORE.get(session_id)
+        shown = _session_execution(session)
+        # Only annotations of the same samples are reused. Changing the threshold of NoMissingEmbeddings
+        # always executes again, see reevaluate_checks
+        if shown is not None and shown.pipeline == normalize_pipeline(pipeline) \
+                and shown.preview == preview_settings(preview):
+            inspector_result = reevaluate_checks(shown.inspector_result, checks, inspections)
+            if inspector_result is not None:
+                execution = render_execution(pipeline, inspector_result, shown.pipeline_output,
+                                             nobiasintroduced_sensitive_columns, shown.pos_dict, shown.preview,
+                                             expanded=shown.expanded)
+                RESULT_CACHE.put(cache_key, execution)
+                SESSION_STORE.update(session_id, execution_key=cache_key, **_HIDE_STATIC_DAG)
+                return _execution_outputs(execution, inspections_and_checks)
+
+        ### Execute pipeline and inspections in a worker process
+        job = JOB_MANAGER.get(session.job_id)
+        if job is not None and not job.finished:
+            if session.job_cache_key == cache_key:
+                # Already queued or running, e.g. triggered by both the click and the pipeline code
+                return [dash.no_update]*8
+            # Replaced by the new execution
+            JOB_MANAGER.cancel(job.job_id)
 
-        # TODO: inspector_result = JSONSerializer.serialize(inspector_result)
-        # TODO: serialize and store POS_DICT as well
+        try:
+            job_id = JOB_MANAGER.submit(execute_incrementally, pipeline, checks, inspections, session.checkpoints,
+                                        preview)
+        except JobQueueFull:
+            return [dash.no_update]*5 + [True, "Too many executions are queued, please try again later.", True]
+        SESSION_STORE.update(session_id, job_id=job_id, job_cache_key=cache_key, job_pipeline=pipeline,
+                             job_sensitive_columns=nobiasintroduced_sensitive_columns, job_preview=preview_settings(preview))
+
+        ### Show static preview of the DAG until the execution is finished
+        figure = dash.no_update
+        if shown is None or shown.pipeline != normalize_pipeline(pipeline):
+            figure = _static_dag_figure(session_id, session, normalize_pipeline(pipeline)) or dash.no_update
+        selected_data = {} if figure is not dash.no_update else dash.no_update
+
+        # The output of the new job is appended to an empty one
+        return [figure, {"text": ""}, dash.no_update, selected_data, dash.no_update, False, "Queued", False]
+
+
+def _execution_outputs(execution, inspections_and_checks=()):
+    """Outputs of the execute callback to show the results of an execution."""
+    prerender_problem_details(execution, *inspections_and_checks)
+    hide_output = False
+
+    ### De-select any DAG nodes and trigger callback to reset details div
+    selected_data = {}
+
+    ### Summary check results
+    if execution.inspector_result.check_to_check_results:
+        summary = get_result_summary(execution.inspector_result)
+    else:
+        summary = dash.no_update
+
+    ### Remind user that a preview only used samples of the data
+    status = "Preview on sampled data, execute to run on all data" if execution.preview else ""
+
+    return execution.figure, {"text": execution.pipeline_output}, hide_output, selected_data, summary, True, status, True
+
+
+def _on_job_progress(session_id, output_length=0, inspections_and_checks=()):
+    """
+    Show the status of the session's execution, and its results once it is done. Only the output after
+    the output_length characters that are already shown is sent.
+    """
+    session = SESSION_STORE.get(session_id)
+    if session.job_id is None:
+        return [dash.no_update]*5 + [True, dash.no_update, True]
+
+    job = JOB_MANAGER.get(session.job_id)
+    if job is None:
+        SESSION_STORE.update(session_id, job_id=None)
+        return [dash.no_update]*5 + [True, "The execution was lost, please execute again.", True]
+    if not job.finished:
+        ### Show the pipeline output and instrumented operators so far
+        output, operators = _job_progress(job)
+        status = f"{job.status.capitalize()} ({job.elapsed:.0f}s)"
+        if operators:
+            last = operators[-1]
+            status += f", {len(operators)} operators instrumented, last: {last['operator']} in line {last['lineno']}"
+        output_length = output_length or 0
+        if len(output) <= output_length:
+            return [dash.no_update]*6 + [status, False]
+        update = {"text": output[output_length:], "offset": output_length}
+        return [dash.no_update, update, False] + [dash.no_update]*3 + [status, False]
+
+    # Only one of possibly overlapping polls gets to handle the result
+    job = JOB_MANAGER.forget(job.job_id)
+    if job is None:
+        return [dash.no_update]*8
+    SESSION_STORE.update(session_id, job_id=None)
+
+    if job.status == DONE:
+        ### Convert extracted DAG into graph data and highlight problematic nodes
+        inspector_result, pipeline_output, checkpoints = job.result
+        shown = _session_execution(session)
+        execution = render_execution(session.job_pipeline, inspector_result, pipeline_output,
+                                     session.job_sensitive_columns, preview=session.job_preview,
+                                     previous_pos_dict=shown.pos_dict if shown is not None else None)
+        RESULT_CACHE.put(session.job_cache_key, execution)
+        checkpoints = CHECKPOINT_POOL.update(session_id, checkpoints)
+        SESSION_STORE.update(session_id, checkpoints=checkpoints, execution_key=session.job_cache_key,
+                             **_HIDE_STATIC_DAG)
+        return _execution_outputs(execution, inspections_and_checks)
+    if job.status == FAILED:
+        output, _ = _job_progress(job)
+        update = {"text": output + job.error}
+        return [dash.no_update, update, False] + [dash.no_update]*2 + [True, "Execution failed", True]
+    return [dash.no_update]*5 + [True, job.error or f"Execution {job.status}", True]
+
+
+def _static_dag_figure(session_id, session, pipeline):
+    """Figure of the static DAG preview of the pipeline, no_update if it is already shown, or None if invalid."""
+    if session.static_pipeline == pipeline:
+        return dash.no_update
+    figure, pos_dict, node_index = render_static_dag(pipeline, session.static_pos_dict)
+    if figure is None:
+        return None
+    SESSION_STORE.update(session_id, static_pipeline=pipeline, static_pos_dict=pos_dict, static_node_index=node_index)
+    return figure
+
+
+def _on_pipeline_typed(session_id, pipeline):
+    """Show the static DAG preview of the pipeline being typed, or the results if it was executed."""
+    if not pipeline:
+        return [dash.no_update]*8
+    session = SESSION_STORE.get(session_id)
+    pipeline = normalize_pipeline(pipeline)
+    status = dash.no_update if session.job_id is not None else ""
+    shown = _session_execution(session)
+
+    if shown is not None and pipeline == shown.pipeline:
+        if session.static_pos_dict is None:
+            return [dash.no_update]*8
+        # Typed back to the executed pipeline
+        SESSION_STORE.update(session_id, **_HIDE_STATIC_DAG)
+        figure = shown.figure
+    else:
+        figure = _static_dag_figure(session_id, session, pipeline)
+        if figure is None or figure is dash.no_update:
+            return [dash.no_update]*8
+        if session.job_id is None:
+            status = "Static preview, execute to inspect the pipeline"
+
+    return [figure, dash.no_update, dash.no_update, {}, dash.no_update, dash.no_update, status, dash.no_update]
+
+
+def _on_dag_node_expand(session_id, expand, sensitive_columns):
+    """
+    Expand the selected super-node of a large DAG, see util/large_dag.py. The expanded DAG is cached
+    under its own key, so other sessions that show the same execution keep their node IDs.
+    """
+    if not expand:
+        return [dash.no_update]*8
+    session = SESSION_STORE.get(session_id)
+    shown = _session_execution(session)
+    # Not shown anymore, e.g. executed again in the meantime
+    if shown is None or session.static_node_index or session.execution_key != expand["execution_key"]:
+        return [dash.no_update]*8
+    node = shown.node_index.get(expand["node_id"])
+    if not isinstance(node, SuperNode):
+        return [dash.no_update]*8
+
+    execution_key = expanded_cache_key(session.execution_key, node.spans)
+    execution = RESULT_CACHE.get(execution_key)
+    if execution is None:
+        execution = render_execution(shown.pipeline, shown.inspector_result, shown.pipeline_output,
+                                     sensitive_columns, preview=shown.preview, previous_pos_dict=shown.pos_dict,
+                                     expanded=shown.expanded + node.spans)
+        RESULT_CACHE.put(execution_key, execution)
+    SESSION_STORE.update(session_id, execution_key=execution_key)
+    return [execution.figure, dash.no_update, dash.no_update, {}] + [dash.no_update]*4
+
+
+def _job_progress(job):
+    """Return the output and the list of instrumented operators that the job has reported so far."""
+    events = list(job.events)
+    output = "".join(payload for kind, payload in events if kind == OUTPUT)
+    operators = [payload for kind, payload in events if kind == OPERATOR]
+    return output, operators
+
+
+def _on_job_cancel(session_id, output_length=0):
+    session = SESSION_STORE.get(session_id)
+    if session.job_id is not None:
+        JOB_MANAGER.cancel(session.job_id)
+    return _on_job_progress(session_id, output_length)
+
+
+def _sweep_thresholds(app):
+    @app.callback(
+        Output("threshold-sweep", "children"),
+        Input("nobiasintroduced-sweep", "n_clicks"),
+        state=[
+            State("session-id", "data"),
+            State("nobiasintroduced-sweep-ratio-range", "value"),
+            State("nobiasintroduced-sweep-probability-range", "value"),
+        ],
+    )
+    def on_sweep_thresholds(sweep_clicks, session_id, ratio_range, probability_range):
+        """
+        When user clicks 'sweep thresholds', show which operators introduce bias for each
+        combination of thresholds in the selected ranges, without executing the pipeline again.
+        """
+        if not sweep_clicks:
+            return dash.no_update
+
+        shown = _session_execution(SESSION_STORE.get(session_id))
+        check_result = get_no_bias_check_result(shown.inspector_result) if shown is not None else None
+        if check_result is None:
+            return "Execute the pipeline with 'No Bias Introduced For' enabled to sweep its thresholds"
 
-        return figure, pipeline_output, hide_output, selected_data, summary
+        ratio_thresholds = threshold_grid(*ratio_range)
+        probability_thresholds = threshold_grid(*probability_range)
+        return create_threshold_sweep_heatmap(check_result, ratio_thresholds, probability_thresholds)
 
 
 def _interact_with_dag(app):
-    @app.callback(
+    # When user hovers on DAG node, emphasize corresponding source code. The code
+    # reference is in the customdata of the point, see assets/dag_figure.js
+    app.clientside_callback(
+        """
+        function(hover_data) {
+            // Un-highlight source code
+            if (!hover_data) {
+                return [];
+            }
+            var point_data = hover_data.points[0].customdata;
+            if (!point_data) {
+                return window.dash_clientside.no_update;
+            }
+            return point_data[1];
+        }
+        """,
         Output("hovered-code-reference", "children"),
         Input("dag", "hoverData"),
-        # state=[
-        #     State("pos-dict", "data"),
-        # ],
     )
-    def on_dag_node_hover(hover_data):
-        """
-        When user hovers on DAG node, show node label and emphasize corresponding
-        source code.
-        """
-        # Un-highlight source code
-        if not hover_data:
-            return []
-
-        # Find DagNode object at this position
-        point = hover_data['points'][0]
-        x = point['x']
-        y = point['y']
-        try:
-            from ..util import POS_DICT
-            node = [node for node, pos in POS_DICT.items() if pos == (x, y)][0]
-        except IndexError:
-            print(f"[hover] Could not find node with pos {x} and {y}")
-            return dash.no_update
-
-        # Highlight source code
-        code_ref = node.code_reference
-        return json.dumps(code_ref.__dict__)
 
     @app.callback(
         [
             Output("selected-code-reference", "children"),
             Output("results-details", "children"),
             Output("results-details-header", "children"),
+            Output("dag-expand", "data"),
         ],
         [
             Input("dag", "selectedData"),
         ],
         state=[
-            # State("inspector-result", "data"),
-            # State("pos-dict", "data"),
+            State("session-id", "data"),
             State("histogramforcolumns-checkbox", "checked"),
             State("rowlineage-checkbox", "checked"),
             State("materializefirstoutputrows-checkbox", "checked"),
@@ -327,25 +646,25 @@ def _interact_with_dag(app):
             State("nomissingembeddings-checkbox", "checked"),
         ]
     )
-    def on_dag_node_select(selected_data, *inspections_and_checks):
+    def on_dag_node_select(selected_data, session_id, *inspections_and_checks):
         """
         When user selects DAG node, show detailed check and inspection results
-        and emphasize corresponding source code.
+        and emphasize corresponding source code. Selecting a collapsed node of a large
+        DAG expands it instead, in the execute callback, which also draws the DAG.
         """
         # Un-highlight source code
         if not selected_data:
-            return [], "Select an operator in the DAG to see operator-specific details", "Details"
-
-        # Find DagNode object at this position
-        point = selected_data['points'][0]
-        x = point['x']
-        y = point['y']
-        try:
-            from ..util import POS_DICT
-            node = [node for node, pos in POS_DICT.items() if pos == (x, y)][0]
-        except IndexError:
-            print(f"[select] Could not find node with pos {x} and {y}")
-            return dash.no_update, dash.no_update, dash.no_update
+            return [], "Select an operator in the DAG to see operator-specific details", "Details", dash.no_update
+
+        # Find DagNode object by its ID
+        node_id, _ = selected_data['points'][0].get('customdata') or (None, None)
+        session = SESSION_STORE.get(session_id)
+        shown = _session_execution(session)
+        node_index = session.static_node_index or (shown.node_index if shown is not None else {})
+        node = node_index.get(node_id)
+        if node is None:
+            print(f"[select] Could not find node with ID {node_id}")
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
         # Highlight source code
         code_ref = node.code_reference
@@ -355,7 +674,61 @@ def _interact_with_dag(app):
             operator=node.operator_type.value,
             code_ref=node.code_reference.lineno,
         )
-        # inspector_result = JSONSerializer.deserialize(inspector_result)
-        operator_details = get_result_details(node, *inspections_and_checks)
+        if session.static_node_index:
+            operator_details = "Execute the pipeline to see the inspection and check results of this operator"
+        elif isinstance(node, SuperNode):
+            # The node ID is only valid for the execution that is shown now
+            expand = {"execution_key": session.execution_key, "node_id": node_id}
+            return json.dumps(code_ref.__dict__), f"Expanding {node.description}", header, expand
+        else:
+            operator_details = get_cached_result_details(shown.result_id, shown.inspector_result, node, node_id,
+                                                         *inspections_and_checks)
 
-        return json.dumps(code_ref.__dict__), operator_details, header
+        return json.dumps(code_ref.__dict__), operator_details, header, dash.no_update
+
+
+def _paginate_result_tables(app):
+    @app.callback(
+        Output({"type": "result-table", "index": MATCH}, "data"),
+        Input({"type": "result-table", "index": MATCH}, "page_current"),
+        Input({"type": "result-table", "index": MATCH}, "page_size"),
+        state=[
+            State({"type": "result-table", "index": MATCH}, "id"),
+            State("session-id", "data"),
+        ],
+        # The first page is sent with the table
+        prevent_initial_call=True,
+    )
+    def on_result_table_page(page_current, page_size, table_id, session_id):
+        """When user pages through the rows of an inspection result, format and send only that page."""
+        shown = _session_execution(SESSION_STORE.get(session_id))
+        df = get_result_table(shown.inspector_result, shown.node_index, table_id["index"]) if shown else None
+        if df is None:
+            print(f"[table] Could not find table {table_id['index']}")
+            return dash.no_update
+        return format_table_page(df, page_current or 0, page_size)
+
+
+def _show_full_histograms(app):
+    @app.callback(
+        [
+            Output({"type": "histogram", "index": MATCH}, "figure"),
+            Output({"type": "full-histogram", "index": MATCH}, "style"),
+        ],
+        Input({"type": "full-histogram", "index": MATCH}, "n_clicks"),
+        state=[
+            State({"type": "full-histogram", "index": MATCH}, "id"),
+            State("session-id", "data"),
+        ],
+        prevent_initial_call=True,
+    )
+    def on_show_full_histogram(n_clicks, histogram_id, session_id):
+        """When user clicks 'show all values' below a summarized histogram, show every distinct value."""
+        shown = _session_execution(SESSION_STORE.get(session_id))
+        column, distribution = get_histogram_distribution(shown.inspector_result, shown.node_index,
+                                                          histogram_id["index"]) if shown else (None, None)
+        if distribution is None:
+            print(f"[histogram] Could not find histogram {histogram_id['index']}")
+            return dash.no_update, dash.no_update
+        figure, _ = create_distribution_histogram_figure(column, distribution, summarize=False)
+        return figure, STYLE_HIDDEN
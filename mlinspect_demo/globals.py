@@ -1,2 +1,69 @@
-INSPECTOR_RESULT = None
-POS_DICT = None
+import os
+
+
+# Result cache: maximum number of cached executions and their total estimated size
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("MLINSPECT_DEMO_RESULT_CACHE_ENTRIES", "16"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("MLINSPECT_DEMO_RESULT_CACHE_MB", "512")) * 2**20
+
+# Session store: time to live in seconds, memory budget, and optional directory to persist sessions in
+SESSION_TTL = int(os.environ.get("MLINSPECT_DEMO_SESSION_TTL", "3600"))
+SESSION_MAX_BYTES = int(os.environ.get("MLINSPECT_DEMO_SESSION_MB", "1024")) * 2**20
+SESSION_DIRECTORY = os.environ.get("MLINSPECT_DEMO_SESSION_DIR") or None
+
+# Pipeline execution: number of worker processes, maximum queued jobs, and wall-clock timeout in seconds
+JOB_MAX_WORKERS = int(os.environ.get("MLINSPECT_DEMO_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.environ.get("MLINSPECT_DEMO_MAX_PENDING", "32"))
+JOB_TIMEOUT = int(os.environ.get("MLINSPECT_DEMO_JOB_TIMEOUT", "600"))
+
+# Worker processes are forked from a server process that has already imported these modules
+WORKER_START_METHOD = os.environ.get("MLINSPECT_DEMO_START_METHOD", "forkserver")
+WORKER_PRELOAD = os.environ.get("MLINSPECT_DEMO_PRELOAD", ",".join([
+    "tensorflow.keras",
+    "sklearn.compose",
+    "sklearn.impute",
+    "sklearn.model_selection",
+    "sklearn.pipeline",
+    "sklearn.preprocessing",
+    "sklearn.tree",
+    "gensim",
+    "mlinspect",
+    "mlinspect.utils",
+    "example_pipelines.utils",
+    "mlinspect_demo.util",
+])).split(",")
+
+# Incremental execution (opt-in): forked checkpoints of an execution between top-level statements, to resume from
+# if a later execution starts with the same statements. Maximum checkpoints per execution and of all sessions,
+# minimum execution time between two checkpoints in seconds, and seconds after which an unused checkpoint exits.
+INCREMENTAL_EXECUTION = os.environ.get("MLINSPECT_DEMO_INCREMENTAL", "0") == "1"
+CHECKPOINT_MAX = int(os.environ.get("MLINSPECT_DEMO_CHECKPOINTS", "8"))
+CHECKPOINT_TOTAL_MAX = int(os.environ.get("MLINSPECT_DEMO_CHECKPOINTS_TOTAL", "32"))
+CHECKPOINT_MIN_SECONDS = float(os.environ.get("MLINSPECT_DEMO_CHECKPOINT_SECONDS", "0.5"))
+CHECKPOINT_TTL = int(os.environ.get("MLINSPECT_DEMO_CHECKPOINT_TTL", "1800"))
+
+# Preview executions: maximum number of rows sampled from each input frame with sensitive columns
+PREVIEW_MAX_ROWS = int(os.environ.get("MLINSPECT_DEMO_PREVIEW_ROWS", "2000"))
+
+# Cache of the frames read by executed pipelines with pd.read_csv: size on disk (disabled by default) and
+# directory, by default in the system temp directory and shared by all instances of the app of the same user
+CSV_CACHE_MAX_BYTES = int(os.environ.get("MLINSPECT_DEMO_CSV_CACHE_MB", "0")) * 2**20
+CSV_CACHE_DIRECTORY = os.environ.get("MLINSPECT_DEMO_CSV_CACHE_DIR") or None
+
+# Layout cache: maximum number of DAG layouts cached in memory, optional directory to persist them in and
+# maximum number of layouts in it
+LAYOUT_CACHE_MAX_ENTRIES = int(os.environ.get("MLINSPECT_DEMO_LAYOUT_CACHE_ENTRIES", "64"))
+LAYOUT_CACHE_DIRECTORY = os.environ.get("MLINSPECT_DEMO_LAYOUT_CACHE_DIR") or None
+LAYOUT_CACHE_MAX_FILES = int(os.environ.get("MLINSPECT_DEMO_LAYOUT_CACHE_FILES", "4096"))
+
+# DAG layout engine: "dot" (graphviz) or "layered" (in process, see util/layered_layout.py)
+LAYOUT_ENGINE = os.environ.get("MLINSPECT_DEMO_LAYOUT_ENGINE", "dot")
+
+# Large DAGs: above this number of nodes, Pipelines and ColumnTransformers are collapsed into expandable nodes,
+# and the DAG is drawn with WebGL and without annotations until zoomed in, see util/large_dag.py
+LARGE_DAG_MIN_NODES = int(os.environ.get("MLINSPECT_DEMO_LARGE_DAG_NODES", "300"))
+
+# Cache of the rendered details of selected DAG nodes: maximum number of entries and their total size, and
+# whether the details of problematic nodes are rendered in the background right after an execution
+DETAILS_CACHE_MAX_ENTRIES = int(os.environ.get("MLINSPECT_DEMO_DETAILS_CACHE_ENTRIES", "256"))
+DETAILS_CACHE_MAX_BYTES = int(os.environ.get("MLINSPECT_DEMO_DETAILS_CACHE_MB", "256")) * 2**20
+PRERENDER_DETAILS = os.environ.get("MLINSPECT_DEMO_PRERENDER_DETAILS", "1") == "1"
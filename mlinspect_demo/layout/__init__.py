@@ -1,3 +1,5 @@
+import uuid
+
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
 import dash_html_components as html
@@ -12,7 +14,9 @@ STYLE_SHOWN = {"display": "block"}
 
 
 def create_layout():
+    """Called on every page load, so that each browser session gets its own session id."""
     return dbc.Container([
+        dcc.Store(id="session-id", data=str(uuid.uuid4())),
         # Header and description
         dbc.Row([
             dbc.Col([
@@ -42,9 +46,11 @@ def create_layout():
                 ], id="pipeline-definition-container", className="container"),
                 # Pipeline execution output
                 html.Div([
-                    # dcc.Store(id="inspector-result"),
                     html.H3("Pipeline Output"),
                     html.Pre(html.Code(id="pipeline-output"), id="pipeline-output-cell"),
+                    # Output sent by the server, and the length of the output shown, see callbacks._execute
+                    dcc.Store(id="pipeline-output-update"),
+                    dcc.Store(id="pipeline-output-length", data=0),
                 ], id="pipeline-output-container", className="container", hidden=True),
             ], width=7, style={"minWidth": str(100*7/12.)+"%"}),
             # DAG
@@ -52,7 +58,6 @@ def create_layout():
                 # Extracted DAG
                 html.Div([
                     html.H3("Extracted DAG"),
-                    # dcc.Store(id="pos-dict"),
                     dcc.Graph(
                         id="dag",
                         figure=go.Figure(
@@ -64,6 +69,10 @@ def create_layout():
                             layout_plot_bgcolor='rgb(255,255,255)',
                         ),
                     ),
+                    # Compact description of the DAG, drawn by assets/dag_figure.js
+                    dcc.Store(id="dag-graph"),
+                    # Collapsed node of a large DAG to expand, see callbacks.on_dag_node_select
+                    dcc.Store(id="dag-expand"),
                 ], id="dag-container", className="container"),
                 # Code references for highlighting source code (hidden)
                 html.Div([
@@ -89,6 +98,11 @@ def create_layout():
                                         options=[{"label": "label1", "value": "value1"},
                                                 {"label": "label2", "value": "value2"}],
                                         style=STYLE_HIDDEN, className="param"),
+                            # ApproximateHistogramForColumns with this error bound, if given
+                            dbc.Input(id="histogram-max-error", type="number",
+                                    min=0.01, max=100, step=0.01,
+                                    placeholder="Max error % of rows (exact if empty)",
+                                    style=STYLE_HIDDEN, className="param"),
                         ], className="custom-switch custom-control"),
                         html.Div([  # Row Lineage
                             dbc.Checkbox(id="rowlineage-checkbox",
@@ -139,6 +153,19 @@ def create_layout():
                                         options=[{"label": "label1", "value": "value1"},
                                                 {"label": "label2", "value": "value2"}],
                                         style=STYLE_HIDDEN, className="param"),
+                            #   sweep over ranges of both thresholds
+                            html.Div([
+                                dbc.Label("Sweep min ratio change (%)"),
+                                dcc.RangeSlider(id="nobiasintroduced-sweep-ratio-range",
+                                                min=-100, max=0, step=5, value=[-60, 0],
+                                                marks={v: str(v) for v in range(-100, 1, 25)}),
+                                dbc.Label("Sweep max prob diff (%)"),
+                                dcc.RangeSlider(id="nobiasintroduced-sweep-probability-range",
+                                                min=0, max=500, step=10, value=[100, 300],
+                                                marks={v: str(v) for v in range(0, 501, 100)}),
+                                dbc.Button("Sweep thresholds", id="nobiasintroduced-sweep",
+                                           color="secondary", size="sm"),
+                            ], id="nobiasintroduced-sweep-container", style=STYLE_HIDDEN, className="param"),
                         ], className="custom-switch custom-control"),
                         html.Div([  # No Illegal Features
                             dbc.Checkbox(id="noillegalfeatures-checkbox",
@@ -169,6 +196,12 @@ def create_layout():
                 html.Br(),
                 html.Br(),
                 dbc.Button(id="execute", color="primary", size="lg", className="mr-1 play-button"),
+                # Execute inspection on samples of the data
+                dbc.Button("Preview", id="preview", color="primary", outline=True, size="sm", className="mr-1"),
+                # Cancel execution and show its progress
+                dbc.Button("Cancel", id="cancel", color="secondary", size="sm", className="mr-1", disabled=True),
+                html.Div(id="job-status", className="job-status"),
+                dcc.Interval(id="job-poll", interval=500, disabled=True),
             ], width=1, style={"minWidth": str(100*1/12.)+"%"}),
             # Details
             dbc.Col([
@@ -176,6 +209,7 @@ def create_layout():
                 html.Div([
                     html.H3("Summary of Checks", id="results-summary-header"),
                     html.Div("Enable checks and execute to see results", id="results-summary"),
+                    html.Div(id="threshold-sweep"),
                 ], id="results-summary-container"),
                 # Details
                 html.Br(),
@@ -187,5 +221,8 @@ def create_layout():
                 ], id="results-details-container"),
             ], id="results-container", width=5, style={"minWidth": str(100*5/12.)+"%"}),
         ], id="inspector-definition-container", className="container", style={"minWidth": "100%"}),
-        html.Div(id="clientside-pipeline-code", hidden=True)
+        html.Div(id="clientside-pipeline-code", hidden=True),
+        # Pipeline code while user is typing, for the static DAG preview
+        html.Div(id="clientside-typed-code", hidden=True),
+        dcc.Interval(id="pipeline-typing-poll", interval=1000),
     ], style={"fontSize": "14px"}, id="app-container")
@@ -1,6 +1,8 @@
-from contextlib import redirect_stdout
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, redirect_stdout
 from inspect import cleandoc
-from io import StringIO
 
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
@@ -16,11 +18,33 @@ from mlinspect import PipelineInspector
 from mlinspect.checks import NoBiasIntroducedFor, NoIllegalFeatures
 from mlinspect.inspections import HistogramForColumns, RowLineage, MaterializeFirstOutputRows
 
-from ..globals import INSPECTOR_RESULT, POS_DICT
+from ..globals import RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_MAX_BYTES, SESSION_TTL, SESSION_MAX_BYTES, SESSION_DIRECTORY, \
+    JOB_MAX_WORKERS, JOB_MAX_PENDING, JOB_TIMEOUT, WORKER_START_METHOD, WORKER_PRELOAD, PREVIEW_MAX_ROWS, \
+    CSV_CACHE_MAX_BYTES, CSV_CACHE_DIRECTORY, LAYOUT_CACHE_MAX_ENTRIES, LAYOUT_CACHE_DIRECTORY, \
+    LAYOUT_CACHE_MAX_FILES, LAYOUT_ENGINE, LARGE_DAG_MIN_NODES, DETAILS_CACHE_MAX_ENTRIES, DETAILS_CACHE_MAX_BYTES, \
+    PRERENDER_DETAILS, INCREMENTAL_EXECUTION, CHECKPOINT_TOTAL_MAX
+from .approximate_histogram import ApproximateHistogramForColumns, uses_approximate_histograms, \
+    with_approximate_histograms
+from .csv_cache import CsvCache, cached_read_csv
+from .histograms import summarize_distribution
+from .incremental import CheckpointPool, limit_native_threads
+from .jobs import JobManager, create_context
+from .large_dag import SuperNode, annotation_max_range, collapse_subgraphs, composite_estimator_spans
+from .layered_layout import layered_layout
+from .layout_cache import LayoutCache
+from .progress import StreamingOutput, report_operators
+from .result_cache import CachedExecution, ResultCache, estimate_size, execution_cache_key, expanded_cache_key, \
+    normalize_pipeline
+from .sampling import sample_settings, sampled_read_csv
+from .session_store import SessionStore
+from .stable_layout import stable_layout
+from .static_dag import extract_static_dag
+from .threshold_sweep import sweep_no_bias_thresholds
 
 
 INSPECTION_SWITCHER = {
     "HistogramForColumns": HistogramForColumns,
+    "ApproximateHistogramForColumns": ApproximateHistogramForColumns,
     "RowLineage": RowLineage,
     "MaterializeFirstOutputRows": MaterializeFirstOutputRows,
 }
@@ -33,24 +57,167 @@ CHECK_SWITCHER = {
 }
 
 
-def execute_inspector_builder(pipeline, checks=None, inspections=None):
-    """Extract DAG the original way, i.e. by creating a PipelineInspectorBuilder."""
-    global INSPECTOR_RESULT
+RESULT_CACHE = ResultCache(max_entries=RESULT_CACHE_MAX_ENTRIES, max_bytes=RESULT_CACHE_MAX_BYTES)
+CHECKPOINT_POOL = CheckpointPool(max_checkpoints=CHECKPOINT_TOTAL_MAX)
+SESSION_STORE = SessionStore(ttl=SESSION_TTL, max_bytes=SESSION_MAX_BYTES, directory=SESSION_DIRECTORY,
+                             on_discard=CHECKPOINT_POOL.discard)
+if INCREMENTAL_EXECUTION:
+    # Before the fork server is started, see incremental.py
+    limit_native_threads()
+JOB_MANAGER = JobManager(max_workers=JOB_MAX_WORKERS, max_pending=JOB_MAX_PENDING, timeout=JOB_TIMEOUT,
+                         context=create_context(WORKER_START_METHOD, WORKER_PRELOAD))
+CSV_CACHE = CsvCache(directory=CSV_CACHE_DIRECTORY, max_bytes=CSV_CACHE_MAX_BYTES)
+LAYOUT_CACHE = LayoutCache(max_entries=LAYOUT_CACHE_MAX_ENTRIES, directory=LAYOUT_CACHE_DIRECTORY,
+                           max_files=LAYOUT_CACHE_MAX_FILES)
+DETAILS_CACHE = ResultCache(max_entries=DETAILS_CACHE_MAX_ENTRIES, max_bytes=DETAILS_CACHE_MAX_BYTES)
+# Renders the details of problematic nodes in the background
+DETAILS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="details")
+
+
+def _create_inspections(inspections):
+    return [
+        INSPECTION_SWITCHER[inspection_name](*inspection_args)
+        for inspection_name, (inspection_bool, inspection_args) in inspections.items()
+        if inspection_bool
+    ]
+
+
+def _create_checks(checks):
+    return [
+        CHECK_SWITCHER[check_name](*check_args)
+        for check_name, (check_bool, check_args) in checks.items()
+        if check_bool
+    ]
+
+
+def execute_inspector_builder(pipeline, checks=None, inspections=None, preview=None):
+    """
+    Extract DAG the original way, i.e. by creating a PipelineInspectorBuilder.
 
+    If preview is not None, it is the list of sensitive columns, and the pipeline is
+    executed on stratified samples of its input data, see sampling.py. Checks that only
+    need histograms of an ApproximateHistogramForColumns are evaluated on those after the
+    execution, see approximate_histogram.py.
+    """
+    new_inspections = _create_inspections(inspections)
+    new_checks = _create_checks(checks)
+    approximated_checks = [check for check in new_checks if uses_approximate_histograms(new_inspections, check)]
     builder = PipelineInspector.on_pipeline_from_string(pipeline)
-    for inspection_name, (inspection_bool, inspection_args) in inspections.items():
-        if inspection_bool:
-            builder = builder.add_required_inspection(INSPECTION_SWITCHER[inspection_name](*inspection_args))
-    for check_name, (check_bool, check_args) in checks.items():
-        if check_bool:
-            builder = builder.add_check(CHECK_SWITCHER[check_name](*check_args))
-
-    output_file = StringIO()
-    with redirect_stdout(output_file):
-        INSPECTOR_RESULT = builder.execute()
+    for inspection in new_inspections:
+        builder = builder.add_required_inspection(inspection)
+    for check in new_checks:
+        if check not in approximated_checks:
+            builder = builder.add_check(check)
+
+    output_file = StreamingOutput()
+    with ExitStack() as stack:
+        stack.enter_context(redirect_stdout(output_file))
+        stack.enter_context(report_operators())
+        if CSV_CACHE.max_bytes:
+            stack.enter_context(cached_read_csv(CSV_CACHE))
+        if preview is not None:
+            stack.enter_context(sampled_read_csv(preview, PREVIEW_MAX_ROWS))
+        inspector_result = builder.execute()
     pipeline_output = output_file.getvalue()
 
-    return pipeline_output
+    if approximated_checks:
+        inspector_result = _evaluate_checks(inspector_result, approximated_checks, new_inspections,
+                                            inspector_result.check_to_check_results)
+
+    return inspector_result, pipeline_output
+
+
+def reevaluate_checks(inspector_result, checks, inspections):
+    """
+    Evaluate checks on the annotations of a previous execution of the same pipeline.
+
+    An inspection with other arguments is a different inspection, e.g. changing the threshold of
+    NoMissingEmbeddings requires MissingEmbeddings with the new threshold, which only a new
+    execution annotates.
+
+    Returns a result with the new check results, or None if the previous execution lacks
+    annotations required by the inspections or checks, i.e. the pipeline has to be executed again.
+    """
+    required_inspections = _create_inspections(inspections)
+    new_checks = _create_checks(checks)
+    for check in new_checks:
+        required_inspections += list(check.required_inspections)
+    annotations = with_approximate_histograms(inspector_result.inspection_to_annotations, required_inspections,
+                                              new_checks)
+    if any(inspection not in annotations for inspection in required_inspections):
+        return None
+
+    return _evaluate_checks(inspector_result, new_checks, required_inspections)
+
+
+def _evaluate_checks(inspector_result, checks, inspections, check_to_check_results=None):
+    """Add the results of the checks, evaluated on approximate histograms of the inspections if they need them."""
+    # The checks only need the DAG and the inspection annotations of the result
+    annotations = with_approximate_histograms(inspector_result.inspection_to_annotations, inspections, checks)
+    annotated_result = type(inspector_result)(inspector_result.dag, annotations, {})
+    check_to_check_results = dict(check_to_check_results or {})
+    check_to_check_results.update({check: check.evaluate(annotated_result) for check in checks})
+    return type(inspector_result)(inspector_result.dag, inspector_result.inspection_to_annotations,
+                                  check_to_check_results)
+
+
+def preview_settings(preview):
+    """
+    The samples that a preview stratified on the given sensitive columns is executed on, or None
+    if preview is None, i.e. the pipeline is executed on all data.
+    """
+    if preview is None:
+        return None
+    return sample_settings(preview, PREVIEW_MAX_ROWS)
+
+
+def render_execution(pipeline, inspector_result, pipeline_output, sensitive_columns, pos_dict=None, preview=None,
+                     previous_pos_dict=None, expanded=()):
+    """
+    Lay out and draw the extracted DAG, highlighting problematic nodes.
+
+    Nodes that are also in the previous layout of the session keep their positions. In large
+    DAGs, Pipelines and ColumnTransformers are collapsed unless their code reference is
+    expanded, see large_dag.py.
+    """
+    G = inspector_result.dag
+    representatives = {}
+    if len(G) > LARGE_DAG_MIN_NODES:
+        G, representatives = collapse_subgraphs(G, composite_estimator_spans(pipeline), expanded)
+    if pos_dict is None:
+        pos_dict = get_dag_layout(G, previous_pos_dict=previous_pos_dict)
+    node_index = get_node_index(G)
+    figure = build_graph_data(G, pos_dict)
+    figure = highlight_problem_nodes(figure, sensitive_columns, inspector_result, node_index, representatives)
+    return CachedExecution(normalize_pipeline(pipeline), inspector_result, pipeline_output, pos_dict, figure, preview,
+                           node_index, tuple(expanded), uuid.uuid4().hex)
+
+
+def render_static_dag(pipeline, previous_pos_dict=None):
+    """
+    Lay out and draw the DAG from static analysis of the pipeline, see static_dag.py.
+
+    Returns the graph data, the positions of the nodes and the node index, or None for all three
+    if the pipeline is not valid Python or no operators were recognized.
+    """
+    try:
+        G = extract_static_dag(pipeline)
+    except (SyntaxError, ValueError):
+        return None, None, None
+    if not G:
+        return None, None, None
+    pos_dict = get_dag_layout(G, previous_pos_dict=previous_pos_dict)
+    return build_graph_data(G, pos_dict), pos_dict, get_node_index(G)
+
+
+def get_node_index(G):
+    """
+    Map the ID of each DAG node to the node.
+
+    The ID of a node is its position in G.nodes, which is also its position in the arrays
+    of build_graph_data.
+    """
+    return dict(enumerate(G.nodes))
 
 
 def _get_new_node_label(node):
@@ -66,132 +233,85 @@ def _get_new_node_label(node):
     return label
 
 
-def _get_pos(G):
-    global POS_DICT
-    POS_DICT = nx.nx_agraph.graphviz_layout(G, 'dot')
-
-    nodes = G.nodes()
-    edges = G.edges()
-
-    Xn, Yn = [], []
-    for node in nodes:
-        x, y = POS_DICT[node]
-        Xn += [x]
-        Yn += [y]
-
-    Xe, Ye = [], []
-    from .addEdge import add_edge
-    for edge0, edge1 in edges:
-        Xe, Ye = add_edge(
-            POS_DICT[edge0],
-            POS_DICT[edge1],
-            Xe,
-            Ye,
-            length_frac=1,
-            # arrow_pos='end',
-            arrow_length=130,
-            arrow_angle=5,
-            # dot_size=15,
-        )
-
-    labels = []
-    annotations = []
-    for node, pos in POS_DICT.items():
-        labels += [_get_new_node_label(node)]
-        annotations += [{
-            'x': pos[0],
-            'y': pos[1],
-            'text': node.operator_type.short_value,
-            'showarrow': False,
-            'font': {
-                "size": 16,
-            },
-        }]
-
-    return Xn, Yn, Xe, Ye, labels, annotations
-
-
-def build_graph_object(G):
+def _graphviz_layout(G):
+    try:
+        return nx.nx_agraph.graphviz_layout(G, 'dot')
+    except ImportError:
+        # To stderr and only once, stdout is the pipeline output while a pipeline is executed
+        warnings.warn("pygraphviz is not installed, falling back to the layered layout", RuntimeWarning)
+        return layered_layout(G)
+
+
+LAYOUT_SWITCHER = {
+    "dot": _graphviz_layout,
+    "layered": layered_layout,
+}
+
+
+def get_dag_layout(G, engine=LAYOUT_ENGINE, previous_pos_dict=None):
     """
-    Convert networkx.DiGraph to a plotly.graph_objects.Figure.
+    Compute the position of each DAG node, or reuse the layout of a structurally identical DAG.
 
-    Adapted from: https://chart-studio.plotly.com/~empet/14007/graphviz-networks-plotted-with-plotly/#/
+    If the layout of a previous DAG is given, its nodes keep their positions and only the
+    new or changed nodes are placed, see stable_layout.py.
     """
-    Xn, Yn, Xe, Ye, labels, annotations = _get_pos(G)
-
-    edges = go.Scatter(
-        x=Xe, y=Ye, mode='lines', hoverinfo='none',
-        line={
-            'color': 'rgb(160,160,160)',
-            'width': 0.75,
-        },
-    )
-    nodes = go.Scatter(
-        x=Xn, y=Yn, mode='markers', name='', hoverinfo='text', text=labels,
-        marker={
-            'size': 20,
-            'color': 'rgb(200,200,200)',
-            'line': {
-                'color': 'black',
-                'width': 0.5,
-            },
-        },
-    )
-    layout = go.Layout(
-        font={'family': "Courier New"},
-        font_color='black',
-        width=500,
-        height=500,
-        showlegend=False,
-        xaxis={'visible': False},
-        yaxis={'visible': False},
-        margin= {
-            'l': 1,
-            'r': 1,
-            'b': 1,
-            't': 1,
-            'pad': 1,
-        },
-        hovermode='closest',
-        plot_bgcolor='white',
-    )
-    layout.annotations = annotations
-
-    fig = go.Figure(data=[edges, nodes], layout=layout)
-    fig.update_layout(clickmode='event+select')
-
-    return fig
-
-
-def _highlight_dag_node_in_figure(dag_node, figure):
-    # Create scatter plot of this node
-    Xn, Yn = POS_DICT[dag_node]
-    label = _get_new_node_label(dag_node)
-    nodes = go.Scatter(
-        x=[Xn], y=[Yn], mode='markers', name='', hoverinfo='text', text=[label],
-        marker={
-            'size': 20,
-            'color': 'red',
-            'line': {
-                'color': 'red',
-                'width': 0.5,
-            },
-        },
-    )
+    def compute_layout(G):
+        return LAYOUT_CACHE.layout(G, LAYOUT_SWITCHER[engine], engine)
 
-    # Append scatter plot to figure
-    if isinstance(figure, dict):
-        figure['data'].append(nodes)
-    else:
-        figure.add_trace(nodes)
+    if previous_pos_dict:
+        return stable_layout(G, previous_pos_dict, compute_layout)
+    return compute_layout(G)
+
+
+def build_graph_data(G, pos_dict):
+    """
+    Compact description of the DAG that the browser draws as a plotly figure, see assets/dag_figure.js.
 
-    return figure
+    Nodes are described by columnar arrays, in the order of their IDs: the index of their operator
+    type in operator_types, their positions, descriptions and code references. Edges are two arrays
+    of the IDs of their parents and children, the browser computes their lines and arrowheads.
+    Problematic nodes are added by highlight_problem_nodes.
+    """
+    nodes = list(G.nodes)
+    index = {node: node_id for node_id, node in enumerate(nodes)}
+    operator_types = {}
+    types = [
+        operator_types.setdefault((node.operator_type.value, node.operator_type.short_value), len(operator_types))
+        for node in nodes
+    ]
+    positions = np.array([pos_dict[node] for node in nodes], dtype=float).reshape(-1, 2)
+    code_references = [node.code_reference for node in nodes]
+    large = len(G) > LARGE_DAG_MIN_NODES
+
+    return {
+        'operator_types': [list(operator_type) for operator_type in operator_types],
+        'types': types,
+        'x': positions[:, 0].tolist(),
+        'y': positions[:, 1].tolist(),
+        'descriptions': [node.description or "" for node in nodes],
+        'code_references': [[code_reference.lineno, code_reference.col_offset,
+                             code_reference.end_lineno, code_reference.end_col_offset]
+                            for code_reference in code_references],
+        'edges': [[index[parent] for parent, _ in G.edges], [index[child] for _, child in G.edges]],
+        'problems': [],
+        # Large DAGs are drawn with WebGL, and their annotations are hidden until the user zooms in,
+        # see large_dag.py
+        'large': large,
+        'annotation_max_range': annotation_max_range(pos_dict) if large else None,
+    }
+
+
+def highlight_problem_nodes(graph_data, sensitive_columns, inspector_result, node_index, representatives=None):
+    """
+    From mlinspect.checks._no_bias_introduced_for:NoBiasIntroducedFor.plot_distribution_change_histograms.
 
+    Problematic nodes that are collapsed are highlighted by their super-node, see large_dag.py.
+    """
+    representatives = representatives or {}
+    problem_nodes = set()
 
-def highlight_problem_nodes(fig_dict, sensitive_columns):
-    """From mlinspect.checks._no_bias_introduced_for:NoBiasIntroducedFor.plot_distribution_change_histograms."""
     try:
-        no_bias_check_result = INSPECTOR_RESULT.check_to_check_results[NoBiasIntroducedFor(sensitive_columns)]
+        no_bias_check_result = inspector_result.check_to_check_results[NoBiasIntroducedFor(sensitive_columns)]
     except (KeyError, TypeError):
         pass
     else:
@@ -202,11 +322,11 @@ def highlight_problem_nodes(fig_dict, sensitive_columns):
                     continue
 
                 # Highlight this node in figure
-                fig_dict = _highlight_dag_node_in_figure(distribution_change.dag_node, fig_dict)
+                problem_nodes.add(distribution_change.dag_node)
 
     # highlight embeddings operator if there are missing embeddings
     try:
-        embedding_check_result = INSPECTOR_RESULT.check_to_check_results[NoMissingEmbeddings()]
+        embedding_check_result = inspector_result.check_to_check_results[NoMissingEmbeddings()]
     except (KeyError, TypeError):
         pass
     else:
@@ -216,52 +336,141 @@ def highlight_problem_nodes(fig_dict, sensitive_columns):
                 continue
 
             # Highlight this node in figure
-            fig_dict = _highlight_dag_node_in_figure(dag_node, fig_dict)
+            problem_nodes.add(dag_node)
 
-    return fig_dict
+    node_ids = {node: node_id for node_id, node in node_index.items()}
+    graph_data['problems'] = sorted({node_ids[representatives.get(node, node)] for node in problem_nodes})
+    return graph_data
 
 
-def _convert_dataframe_to_dash_table(df):
-    columns = [{"name": i, "id": i} for i in df.columns]
-    data = [
-        {
-            k: np.array2string(v, precision=2, threshold=2)
-            if isinstance(v, np.ndarray) else str(v)
-            for k, v in record.items()
-        }
-        for record in df.to_dict('records')
+# Rows per page of the paginated inspection result tables
+RESULT_TABLE_PAGE_SIZE = 10
+
+
+def _format_column(column):
+    """Format the cells of a column as strings, arrays abbreviated with np.array2string."""
+    if column.dtype.kind in "biuf":
+        return column.to_numpy().astype(str).tolist()
+    return [
+        np.array2string(v, precision=2, threshold=2) if isinstance(v, np.ndarray) else str(v)
+        for v in column
     ]
 
+
+def format_table_page(df, page_current=0, page_size=None):
+    """Records of the rows on the given page of the DataFrame, or of all rows if page_size is None."""
+    if page_size is not None:
+        df = df.iloc[page_current * page_size:(page_current + 1) * page_size]
+    formatted = [_format_column(df.iloc[:, i]) for i in range(df.shape[1])]
+    return [dict(zip(df.columns, row)) for row in zip(*formatted)]
+
+
+def _convert_dataframe_to_dash_table(df, table_id=None):
+    """
+    DataTable of the DataFrame. If a table ID is given, only the first page is sent, and the other
+    pages are formatted on request, see get_result_table.
+    """
+    columns = [{"name": i, "id": i} for i in df.columns]
+    style_cell = {
+        'whiteSpace': 'normal',
+        'height': 'auto',
+    }
+    if table_id is None:
+        return dash_table.DataTable(columns=columns, data=format_table_page(df), style_cell=style_cell)
+
     return dash_table.DataTable(
+        id={"type": "result-table", "index": table_id},
         columns=columns,
-        data=data,
-        style_cell={
-            'whiteSpace': 'normal',
-            'height': 'auto',
-        },
+        data=format_table_page(df, 0, RESULT_TABLE_PAGE_SIZE),
+        page_action='custom',
+        page_current=0,
+        page_size=RESULT_TABLE_PAGE_SIZE,
+        page_count=max(1, -(-len(df) // RESULT_TABLE_PAGE_SIZE)),
+        style_cell=style_cell,
     )
 
 
-def get_result_summary():
-    check_results = INSPECTOR_RESULT.check_to_check_results
+def _result_table_id(node_id, inspection_index, input_index=None):
+    """
+    ID of the output rows of a node, or of the rows of its input_index-th predecessor, in an inspection
+    result. None if the node has no ID, i.e. the table is not paginated.
+    """
+    if node_id is None:
+        return None
+    return f"{node_id}/{inspection_index}/{'output' if input_index is None else input_index}"
+
+
+def get_result_table(inspector_result, node_index, table_id):
+    """The DataFrame of an inspection result table by its ID, see _result_table_id, or None if it is gone."""
+    try:
+        node_id, inspection_index, input_index = table_id.split("/")
+        node = node_index[int(node_id)]
+        result_dict = list(inspector_result.inspection_to_annotations.values())[int(inspection_index)]
+        if input_index != "output":
+            node = list(inspector_result.dag.predecessors(node))[int(input_index)]
+        return result_dict[node]
+    except (AttributeError, ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def get_result_summary(inspector_result):
+    check_results = inspector_result.check_to_check_results
     check_result_df = PipelineInspector.check_results_as_data_frame(check_results)
     return _convert_dataframe_to_dash_table(check_result_df)
 
 
-def _create_distribution_histogram(column, distribution_dict):
-    keys = list(distribution_dict.keys())
-    counts = list(distribution_dict.values())
+def create_distribution_histogram_figure(column, distribution_dict, summarize=True):
+    """Bar chart of the distribution, summarized if it has many distinct values, see histograms.py."""
+    if summarize:
+        keys, counts, summarized = summarize_distribution(distribution_dict)
+    else:
+        keys, counts, summarized = list(distribution_dict.keys()), list(distribution_dict.values()), False
     data = go.Bar(x=keys, y=counts, text=counts, hoverinfo="text")
     title = {
-        "text": f"Column '{column}' Distribution",
+        "text": f"Column '{column}' Distribution" + (" (Summary)" if summarized else ""),
         "font_size": 12,
     }
     margin = {"l": 20, "r": 20, "t": 20, "b": 20}
 
     layout = go.Layout(title=title, margin=margin, hovermode="x",
                        autosize=False, width=380, height=300)
-    figure = go.Figure(data=data, layout=layout)
-    return dcc.Graph(figure=figure)
+    return go.Figure(data=data, layout=layout), summarized
+
+
+def _create_distribution_histogram(column, distribution_dict, histogram_id=None):
+    """
+    Histogram of the distribution. If it is summarized and has an ID, the full distribution is shown
+    on request, see get_histogram_distribution.
+    """
+    figure, summarized = create_distribution_histogram_figure(column, distribution_dict)
+    if not summarized or histogram_id is None:
+        return dcc.Graph(figure=figure)
+    return html.Div([
+        dcc.Graph(id={"type": "histogram", "index": histogram_id}, figure=figure),
+        dbc.Button(f"Show all {len(distribution_dict)} values", id={"type": "full-histogram", "index": histogram_id},
+                   color="link", size="sm"),
+    ])
+
+
+def _histogram_id(node_id, inspection_index, column):
+    """ID of the histogram of a column of a node in an inspection result. None if the node has no ID."""
+    if node_id is None:
+        return None
+    return f"{node_id}/{inspection_index}/{column}"
+
+
+def get_histogram_distribution(inspector_result, node_index, histogram_id):
+    """Column and distribution of a histogram by its ID, see _histogram_id, or None for both if it is gone."""
+    try:
+        node_id, inspection_index, column = histogram_id.split("/", 2)
+        node = node_index[int(node_id)]
+        result_dict = list(inspector_result.inspection_to_annotations.values())[int(inspection_index)]
+        distributions = result_dict[node]
+        # Columns are passed as strings in the ID
+        column = next(key for key in distributions if str(key) == column)
+        return column, distributions[column]
+    except (AttributeError, ValueError, KeyError, IndexError, TypeError, StopIteration):
+        return None, None
 
 
 def _create_distribution_change_histograms(column, distribution_change):
@@ -310,20 +519,62 @@ def _create_removal_probability_histograms(column, distribution_change):
     return dcc.Graph(figure=figure)
 
 
-def get_result_details(node,
+def get_no_bias_check_result(inspector_result):
+    """Return the result of the NoBiasIntroducedFor check, or None if it was not executed."""
+    for check, result_obj in inspector_result.check_to_check_results.items():
+        if isinstance(check, NoBiasIntroducedFor):
+            return result_obj
+    return None
+
+
+def create_threshold_sweep_heatmap(check_result, ratio_thresholds, probability_thresholds):
+    """Show how many DAG nodes introduce bias for each combination of NoBiasIntroducedFor thresholds."""
+    nodes, failures = sweep_no_bias_thresholds(check_result, ratio_thresholds, probability_thresholds)
+    failure_counts = failures.sum(axis=0).T
+    labels = np.array([_get_new_node_label(node).replace("\n", " ") for node in nodes], dtype=object)
+
+    hover_text = []
+    for p, probability_threshold in enumerate(probability_thresholds):
+        row = []
+        for r, ratio_threshold in enumerate(ratio_thresholds):
+            failing_nodes = "<br>".join(labels[failures[:, r, p]]) or "no operators"
+            row += [f"Min ratio change {ratio_threshold:.0%}, max prob diff {probability_threshold:.0%}:<br>"
+                    f"{failing_nodes}"]
+        hover_text += [row]
+
+    data = go.Heatmap(
+        x=np.asarray(ratio_thresholds) * 100, y=np.asarray(probability_thresholds) * 100, z=failure_counts,
+        text=hover_text, hoverinfo="text", colorscale="Reds", zmin=0,
+        colorbar={"title": {"text": "Operators", "side": "right"}},
+    )
+    title = {
+        "text": "Operators introducing bias per threshold setting",
+        "font_size": 12,
+    }
+    margin = {"l": 20, "r": 20, "t": 30, "b": 20}
+
+    layout = go.Layout(title=title, margin=margin, autosize=False, width=500, height=400,
+                       xaxis={"title": "Min ratio change (%)"}, yaxis={"title": "Max prob diff (%)"})
+    figure = go.Figure(data=data, layout=layout)
+    return dcc.Graph(figure=figure)
+
+
+def get_result_details(inspector_result, node,
                        histogramforcolumns, rowlineage, materializefirstoutputrows,
-                       nobiasintroduced, noillegalfeatures, nomissingembeddings):
+                       nobiasintroduced, noillegalfeatures, nomissingembeddings, node_id=None):
+    """Details of the inspection and check results of a node, with paginated row tables if its ID is given."""
     details = []
 
     # Show inspection results
-    for inspection, result_dict in INSPECTOR_RESULT.inspection_to_annotations.items():
+    for inspection_index, (inspection, result_dict) in enumerate(inspector_result.inspection_to_annotations.items()):
         if (isinstance(inspection, RowLineage) and rowlineage) or \
             (isinstance(inspection, MaterializeFirstOutputRows) and materializefirstoutputrows):
             output_df = result_dict[node]
-            output_table = _convert_dataframe_to_dash_table(output_df)
+            output_table = _convert_dataframe_to_dash_table(output_df, _result_table_id(node_id, inspection_index))
             input_tables = [
-                _convert_dataframe_to_dash_table(result_dict[input_node])
-                for input_node in INSPECTOR_RESULT.dag.predecessors(node)
+                _convert_dataframe_to_dash_table(result_dict[input_node],
+                                                 _result_table_id(node_id, inspection_index, input_node_index))
+                for input_node_index, input_node in enumerate(inspector_result.dag.predecessors(node))
             ]
             if input_tables:
                 input_tables.insert(0, dbc.Label("Input Rows"))
@@ -341,7 +592,8 @@ def get_result_details(node,
             distribution_dicts = result_dict[node]
             graphs = []
             for column, distribution in distribution_dicts.items():
-                graphs += [_create_distribution_histogram(column, distribution)]
+                histogram_id = _histogram_id(node_id, inspection_index, column)
+                graphs += [_create_distribution_histogram(column, distribution, histogram_id)]
             element = html.Div([
                 html.H4(f"{inspection}", className="result-item-header"),
                 html.Div(graphs, className="result-item-content"),
@@ -351,7 +603,7 @@ def get_result_details(node,
             print("inspection not selected or not implemented:", inspection)
 
     # Show check results
-    for check, result_obj in INSPECTOR_RESULT.check_to_check_results.items():
+    for check, result_obj in inspector_result.check_to_check_results.items():
         if (isinstance(check, NoBiasIntroducedFor) and nobiasintroduced):
             if node not in result_obj.bias_distribution_change:
                 continue
@@ -384,3 +636,42 @@ def get_result_details(node,
             print("check not selected or not implemented:", check)
 
     return details
+
+
+# Number of objects visited to estimate the size of the details of a node
+DETAILS_ESTIMATE_MAX_OBJECTS = 1000
+
+
+def _details_key(result_id, node_id, inspections_and_checks):
+    return result_id, node_id, tuple(bool(enabled) for enabled in inspections_and_checks)
+
+
+def get_cached_result_details(result_id, inspector_result, node, node_id, *inspections_and_checks):
+    """
+    get_result_details, memoized on the rendered result, the node and the enabled inspections and checks.
+    Results without an ID are not cached.
+    """
+    if result_id is None:
+        return get_result_details(inspector_result, node, *inspections_and_checks, node_id=node_id)
+    key = _details_key(result_id, node_id, inspections_and_checks)
+    details = DETAILS_CACHE.get(key)
+    if details is None:
+        details = get_result_details(inspector_result, node, *inspections_and_checks, node_id=node_id)
+        # Roughly, from a short walk of the components, which takes about a millisecond
+        DETAILS_CACHE.put(key, details, size=estimate_size(details, max_objects=DETAILS_ESTIMATE_MAX_OBJECTS))
+    return details
+
+
+def prerender_problem_details(execution, *inspections_and_checks):
+    """
+    Render the details of the problematic nodes of an execution in the background, users click them first.
+    Details that are cached already, e.g. when a cached execution is shown again, are not rendered again.
+    """
+    if not PRERENDER_DETAILS or execution.result_id is None:
+        return
+    for node_id in execution.figure['problems']:
+        node = execution.node_index[node_id]
+        if not isinstance(node, SuperNode) \
+                and _details_key(execution.result_id, node_id, inspections_and_checks) not in DETAILS_CACHE:
+            DETAILS_EXECUTOR.submit(get_cached_result_details, execution.result_id, execution.inspector_result,
+                                    node, node_id, *inspections_and_checks)
@@ -0,0 +1,223 @@
+"""
+Histograms of sensitive columns with a fixed memory footprint, for inputs with millions of rows.
+
+ApproximateHistogramForColumns counts the values of each operator in a count-min sketch, and keeps
+track of the most frequent values in a Misra-Gries summary. Both are sized by an error bound epsilon:
+with probability 1 - delta, each count is overestimated by at most epsilon times the number of rows,
+and every value with more than that many rows is kept. Its annotations have the same format as those
+of HistogramForColumns, so they are shown the same way and NoBiasIntroducedFor can be evaluated on
+them, see with_approximate_histograms. The exact histograms are never counted.
+"""
+import math
+from collections import Counter
+
+import numpy as np
+
+from mlinspect.inspections import HistogramForColumns, InspectionInputDataSource, InspectionInputNAryOperator, \
+    InspectionInputSinkOperator, InspectionInputUnaryOperator
+
+
+DEFAULT_EPSILON = 0.001
+DEFAULT_DELTA = 0.01
+
+# Number of rows counted at once
+_BATCH_SIZE = 4096
+
+# All missing values are counted as one value
+_NAN = float("nan")
+
+
+def _canonical(value):
+    if isinstance(value, float) and math.isnan(value):
+        return _NAN
+    return value
+
+
+class CountMinSketch:
+    """Counts of values in a fixed-size table, overestimated by at most epsilon * total with probability 1 - delta."""
+
+    def __init__(self, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA, seed=0):
+        # Multiply-shift hashing into a power of two number of columns
+        self.bits = max(1, math.ceil(math.log2(math.e / epsilon)))
+        depth = max(1, math.ceil(math.log(1 / delta)))
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(1, 2**63, size=depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((depth, 2**self.bits), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, values):
+        hashes = np.fromiter((hash(value) for value in values), dtype=np.int64, count=len(values)).view(np.uint64)
+        return (np.multiply.outer(self.multipliers, hashes) >> np.uint64(64 - self.bits)).astype(np.intp)
+
+    def update(self, counts):
+        """Add a dict {value: count}."""
+        values = list(counts)
+        columns = self._columns(values)
+        weights = np.fromiter(counts.values(), dtype=np.int64, count=len(values))
+        for row, row_columns in zip(self.table, columns):
+            np.add.at(row, row_columns, weights)
+        self.total += int(weights.sum())
+
+    def estimate(self, values):
+        """Estimated counts of the values."""
+        if not values:
+            return np.zeros(0, dtype=np.int64)
+        return np.take_along_axis(self.table, self._columns(values), axis=1).min(axis=0)
+
+
+class MisraGries:
+    """The values with more than total / (size + 1) occurrences, among at most size counters."""
+
+    def __init__(self, size):
+        self.size = size
+        self.counters = {}
+
+    def update(self, counts):
+        """Add a dict {value: count}, merging it like two summaries."""
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        if len(self.counters) > self.size:
+            # Subtract the (size + 1)-th largest count, which leaves at most size positive counters
+            threshold = np.partition(np.fromiter(self.counters.values(), dtype=np.int64),
+                                     -(self.size + 1))[-(self.size + 1)]
+            self.counters = {value: count - threshold for value, count in self.counters.items() if count > threshold}
+
+    def values(self):
+        return list(self.counters)
+
+
+class ColumnSketch:
+    """Approximate histogram of the values of one column."""
+
+    def __init__(self, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA):
+        self.count_min = CountMinSketch(epsilon, delta)
+        self.heavy_hitters = MisraGries(math.ceil(1 / epsilon))
+        self.batch = []
+
+    def add(self, value):
+        self.batch.append(_canonical(value))
+        if len(self.batch) >= _BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            counts = Counter(self.batch)
+            self.count_min.update(counts)
+            self.heavy_hitters.update(counts)
+            self.batch = []
+
+    def histogram(self):
+        """Dict {value: estimated count} of the most frequent values, like HistogramForColumns."""
+        self.flush()
+        values = self.heavy_hitters.values()
+        return dict(zip(values, self.count_min.estimate(values).tolist()))
+
+
+class ApproximateHistogramForColumns(HistogramForColumns):
+    """
+    HistogramForColumns with counts overestimated by at most epsilon times the number of rows of an
+    operator, with probability 1 - delta, and values with fewer rows possibly left out.
+    """
+
+    def __init__(self, sensitive_columns, epsilon=DEFAULT_EPSILON, delta=DEFAULT_DELTA):
+        super().__init__(sensitive_columns)
+        self.epsilon = epsilon
+        self.delta = delta
+        self._sketch_output = None
+
+    def visit_operator(self, inspection_input):
+        # Like HistogramForColumns, the annotation of each row is its values of the sensitive columns,
+        # so that they are still known once the columns were projected out
+        if isinstance(inspection_input, InspectionInputSinkOperator):
+            # E.g. estimators have no histograms
+            for _ in inspection_input.row_iterator:
+                yield None
+            return
+        sketches = [ColumnSketch(self.epsilon, self.delta) for _ in self.sensitive_columns]
+        for values in self._sensitive_values(inspection_input):
+            if values is not None:
+                for sketch, value in zip(sketches, values):
+                    # The columns of a data source that it does not have
+                    if value is not None:
+                        sketch.add(value)
+            yield values
+        self._sketch_output = {column: sketch.histogram()
+                               for column, sketch in zip(self.sensitive_columns, sketches)}
+
+    def _sensitive_values(self, inspection_input):
+        """The values of the sensitive columns of each row, taken from its input rows or their annotations."""
+        if isinstance(inspection_input, InspectionInputDataSource):
+            indexes = [inspection_input.output_columns.get_index_of_column(column)
+                       for column in self.sensitive_columns]
+            for row in inspection_input.row_iterator:
+                yield [row.output[index] if index is not None else None for index in indexes]
+        elif isinstance(inspection_input, InspectionInputUnaryOperator):
+            indexes = [inspection_input.input_columns.get_index_of_column(column)
+                       for column in self.sensitive_columns]
+            for row in inspection_input.row_iterator:
+                yield [row.input[index] if index is not None else _annotated(row.annotation, position)
+                       for position, index in enumerate(indexes)]
+        elif isinstance(inspection_input, InspectionInputNAryOperator):
+            # From the first input that has the column, or else the first one that has it annotated
+            indexes = [[columns.get_index_of_column(column) for columns in inspection_input.inputs_columns]
+                       for column in self.sensitive_columns]
+            for row in inspection_input.row_iterator:
+                values = []
+                for position, input_indexes in enumerate(indexes):
+                    value = next((row_input[index] for row_input, index in zip(row.inputs, input_indexes)
+                                  if index is not None), None)
+                    if value is None:
+                        value = next((_annotated(annotation, position) for annotation in row.annotation
+                                      if _annotated(annotation, position) is not None), None)
+                    values.append(value)
+                yield values
+        else:
+            for _ in inspection_input.row_iterator:
+                yield None
+
+    def get_operator_annotation_after_visit(self):
+        sketch_output, self._sketch_output = self._sketch_output, None
+        return sketch_output
+
+    @property
+    def inspection_id(self):
+        return tuple(self.sensitive_columns), self.epsilon, self.delta
+
+
+def _annotated(annotation, position):
+    return annotation[position] if annotation is not None else None
+
+
+def with_approximate_histograms(inspection_to_annotations, inspections, checks):
+    """
+    The annotations, with the HistogramForColumns required by the checks taken from an
+    ApproximateHistogramForColumns of the inspections that has all their sensitive columns.
+    """
+    annotations = dict(inspection_to_annotations)
+    approximate = [inspection for inspection in inspections
+                   if isinstance(inspection, ApproximateHistogramForColumns) and inspection in annotations]
+    for check in checks:
+        for required in check.required_inspections:
+            if type(required) is not HistogramForColumns or required in annotations:
+                continue
+            source = next((inspection for inspection in approximate
+                           if set(required.sensitive_columns) <= set(inspection.sensitive_columns)), None)
+            if source is not None:
+                annotations[required] = {
+                    node: {column: histograms[column] for column in required.sensitive_columns}
+                    if histograms is not None else None
+                    for node, histograms in annotations[source].items()
+                }
+    return annotations
+
+
+def uses_approximate_histograms(inspections, check):
+    """Whether all inspections required by the check are histograms approximated by one of the inspections."""
+    required = list(check.required_inspections)
+    return bool(required) and all(
+        type(histogram) is HistogramForColumns and any(
+            isinstance(inspection, ApproximateHistogramForColumns)
+            and set(histogram.sensitive_columns) <= set(inspection.sensitive_columns)
+            for inspection in inspections)
+        for histogram in required
+    )
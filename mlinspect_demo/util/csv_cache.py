@@ -0,0 +1,169 @@
+"""
+Cache for the frames that executed pipelines read with pd.read_csv.
+
+Entries are keyed on the path, modification time and size of the file together with
+the arguments of the read_csv call, so changed files are read again. They are stored
+column by column in a directory shared by all worker processes: numeric, boolean and
+datetime columns as .npy files, the other columns, the index and the column labels as
+a pickle. Loading them is much faster than parsing the file, but still copies the
+columns into the blocks of the frame. The least recently used entries are removed once
+the total size of the cache exceeds its budget. The cache is disabled by default.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_DIRECTORY = os.path.join(tempfile.gettempdir(), f"mlinspect-demo-csv-cache-{os.getuid()}")
+
+# Arguments for which read_csv does not return a single DataFrame
+_UNCACHEABLE_ARGUMENTS = {"iterator", "chunksize"}
+
+
+def _is_mappable(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+
+def is_private_directory(path):
+    """Whether the directory exists, and is owned by and only writable by the current user."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _directory_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class CsvCache:
+    """Columnar on-disk cache of parsed CSV files, bounded by total size, disabled if that is 0."""
+
+    def __init__(self, directory=None, max_bytes=0):
+        self.directory = directory or DEFAULT_DIRECTORY
+        self.max_bytes = max_bytes
+
+    def key(self, args, kwargs):
+        """Return the key of a read_csv call, or None if its result can not be cached."""
+        if _UNCACHEABLE_ARGUMENTS & set(kwargs):
+            return None
+        args = list(args)
+        path = args.pop(0) if args else kwargs.get("filepath_or_buffer")
+        if not isinstance(path, (str, os.PathLike)):
+            return None
+        try:
+            path = os.path.abspath(os.fspath(path))
+            stat = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            # e.g. URLs
+            return None
+        kwargs = {name: value for name, value in kwargs.items() if name != "filepath_or_buffer"}
+        content = repr((path, stat.st_mtime_ns, stat.st_size, args, sorted(kwargs.items())))
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def load(self, key):
+        """Return the cached frame for this key, or None, and mark it as recently used."""
+        # Entries are unpickled, so they must not be written by other users
+        if not is_private_directory(self.directory):
+            return None
+        entry = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(entry, "frame.pickle"), "rb") as file:
+                index, columns, pickled_columns = pickle.load(file)
+            data = {}
+            for position in range(len(columns)):
+                if position in pickled_columns:
+                    data[position] = pickled_columns[position]
+                else:
+                    data[position] = np.load(os.path.join(entry, f"{position}.npy"))
+            os.utime(entry)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            # Not cached, or evicted by another process in the meantime
+            return None
+        frame = pd.DataFrame(data, index=index)
+        frame.columns = columns
+        return frame
+
+    def store(self, key, frame):
+        """Write the frame to the cache, evicting the least recently used entries if over budget."""
+        if not isinstance(frame, pd.DataFrame) or not self.max_bytes:
+            return
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        except OSError:
+            return
+        if not is_private_directory(self.directory):
+            return
+        temporary = os.path.join(self.directory, f".{uuid.uuid4().hex}")
+        os.makedirs(temporary)
+        try:
+            pickled_columns = {}
+            for position in range(frame.shape[1]):
+                column = frame.iloc[:, position]
+                if _is_mappable(column.dtype):
+                    np.save(os.path.join(temporary, f"{position}.npy"), column.to_numpy(), allow_pickle=False)
+                else:
+                    pickled_columns[position] = column.array
+            with open(os.path.join(temporary, "frame.pickle"), "wb") as file:
+                pickle.dump((frame.index, frame.columns, pickled_columns), file, pickle.HIGHEST_PROTOCOL)
+            if _directory_size(temporary) > self.max_bytes:
+                return
+            # Atomic, so that other processes never load partially written entries
+            os.rename(temporary, os.path.join(self.directory, key))
+        except OSError:
+            # Stored by another process in the meantime, or the disk is full
+            pass
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+        self._evict()
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and not entry.name.startswith("."):
+                try:
+                    entries.append((entry.stat().st_mtime, _directory_size(entry.path), entry.path))
+                except OSError:
+                    continue
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_bytes -= size
+
+
+@contextmanager
+def cached_read_csv(cache):
+    """Make pd.read_csv return cached frames where possible."""
+    original_read_csv = pd.read_csv
+
+    # mlinspect recognizes pd.read_csv by the module of the function
+    @functools.wraps(original_read_csv)
+    def read_csv(*args, **kwargs):
+        key = cache.key(args, kwargs)
+        if key is None:
+            return original_read_csv(*args, **kwargs)
+        frame = cache.load(key)
+        if frame is None:
+            frame = original_read_csv(*args, **kwargs)
+            cache.store(key, frame)
+        return frame
+
+    pd.read_csv = read_csv
+    try:
+        yield
+    finally:
+        pd.read_csv = original_read_csv
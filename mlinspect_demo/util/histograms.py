@@ -0,0 +1,75 @@
+"""
+Summaries of the value distributions of HistogramForColumns for columns with many distinct values.
+
+A histogram with thousands of bars is slow to build, to send and to read. Numeric columns
+are grouped into bins with about the same number of rows each (quantiles of the distribution),
+other columns are reduced to their most frequent values and one bar for all other values.
+"""
+import numbers
+
+import numpy as np
+
+
+# Maximum number of bars of a summarized histogram
+HISTOGRAM_MAX_BARS = 20
+
+
+def _is_numeric(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, (bool, np.bool_))
+
+
+def _quantile_bins(values, counts, max_bars):
+    """Bins of the numeric values with about the same total count each, labeled with their ranges."""
+    order = np.argsort(values, kind="stable")
+    values, counts = values[order], counts[order]
+    cumulative = np.cumsum(counts)
+    quantiles = np.linspace(0, 1, max_bars + 1)[1:-1] * cumulative[-1]
+    inner_edges = np.unique(values[np.searchsorted(cumulative, quantiles)])
+    edges = np.unique(np.concatenate([[values[0]], inner_edges, [values[-1]]]))
+    # Values on an edge are in the bin that starts there, the last edge is included in the last bin
+    bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, max(len(edges) - 2, 0))
+    bin_counts = np.bincount(bins, weights=counts, minlength=max(len(edges) - 1, 1)).astype(np.int64)
+    if len(edges) == 1:
+        return [f"{edges[0]:g}"], bin_counts.tolist()
+    labels = [f"[{low:g}, {high:g})" for low, high in zip(edges[:-2], edges[1:-1])] + \
+        [f"[{edges[-2]:g}, {edges[-1]:g}]"]
+    return labels, bin_counts.tolist()
+
+
+def _top_values(keys, counts, max_bars):
+    """The most frequent values, and one bar for all others."""
+    top = np.argsort(-counts, kind="stable")[:max_bars - 1]
+    other = np.ones(len(keys), dtype=bool)
+    other[top] = False
+    labels = [str(keys[i]) for i in top] + [f"other ({int(other.sum())} values)"]
+    return labels, counts[top].tolist() + [int(counts[other].sum())]
+
+
+def summarize_distribution(distribution, max_bars=HISTOGRAM_MAX_BARS):
+    """
+    Keys and counts of the bars of the histogram of a distribution dict {value: count}, and whether
+    it was summarized. Distributions with at most max_bars values are returned as they are.
+    """
+    keys = list(distribution.keys())
+    counts = np.fromiter(distribution.values(), dtype=np.int64, count=len(keys))
+    if len(keys) <= max_bars:
+        return keys, counts.tolist(), False
+
+    numeric = np.fromiter((_is_numeric(key) for key in keys), dtype=bool, count=len(keys))
+    # Mostly numeric, e.g. with a few missing values
+    if numeric.sum() > len(keys) // 2:
+        values = np.array([key for key, is_numeric in zip(keys, numeric) if is_numeric], dtype=float)
+        value_counts = counts[numeric]
+        missing = np.isnan(values)
+        labels, bar_counts = _quantile_bins(values[~missing], value_counts[~missing], max_bars) \
+            if (~missing).any() else ([], [])
+        # Missing and non-numeric values, e.g. None or '?', keep their own bars
+        rest = [(str(key), int(count)) for key, count, is_numeric in zip(keys, counts, numeric) if not is_numeric]
+        if missing.any():
+            rest.append(("nan", int(value_counts[missing].sum())))
+        if len(rest) < max_bars:
+            return labels + [key for key, _ in rest], bar_counts + [count for _, count in rest], True
+
+    key_array = np.empty(len(keys), dtype=object)
+    key_array[:] = keys
+    return (*_top_values(key_array, counts, max_bars), True)
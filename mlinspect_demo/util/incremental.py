@@ -0,0 +1,381 @@
+"""
+Incremental execution of pipelines that reuses the state after an unchanged prefix.
+
+mlinspect executes the instrumented pipeline by compiling its AST and executing it.
+During a job, both are intercepted so that the pipeline is executed one top-level
+statement at a time. Between statements, the worker process forks a dormant
+checkpoint process that holds the complete interpreter state at this point: the
+variables of the pipeline as well as the DAG and annotations that mlinspect has
+collected so far.
+
+Checkpoints are identified by a digest of the statements before them (including their
+positions in the source code) and of the inspection and check configuration. When a
+later execution starts with the same statements, it connects to the checkpoint with
+the longest matching prefix, which forks again and continues with the new statements
+from there on. The parsed pipeline that mlinspect holds is replaced by the new one, so
+mlinspect then finishes as usual, and the resulting DAG, annotations and
+check results are sent back to the job. If the resumed execution fails, the checkpoint
+is discarded and the job executes the pipeline itself, from a shorter prefix or the start.
+
+Incremental execution is disabled by default. It relies on mlinspect compiling and
+executing the pipeline with the builtins compile and exec, and a process can only be
+forked safely while it runs a single thread, so no checkpoints are created once e.g.
+TensorFlow started its thread pools. The checkpoints of all sessions are limited in
+total, and released when their session expires, see CheckpointPool.
+"""
+import ast
+import builtins
+import hashlib
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import warnings
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from multiprocessing.connection import Connection
+
+from ..globals import INCREMENTAL_EXECUTION, CHECKPOINT_MAX, CHECKPOINT_MIN_SECONDS, CHECKPOINT_TTL
+from . import jobs, progress
+from .csv_cache import is_private_directory
+
+
+Checkpoint = namedtuple("Checkpoint", ["index", "digest", "address"])
+
+CHECKPOINT_DIRECTORY = os.path.join(tempfile.gettempdir(), f"mlinspect-demo-checkpoints-{os.getuid()}")
+
+# Thread pools of numerical libraries, which keep worker processes from forking checkpoints
+_NATIVE_THREAD_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                            "TF_NUM_INTEROP_THREADS", "TF_NUM_INTRAOP_THREADS"]
+
+
+class ResumedExecutionError(Exception):
+    """Raised when an execution resumed from a checkpoint failed, the checkpoint is then discarded."""
+
+
+class _Resumed(Exception):
+    """Unwinds the instrumented execution in a job that was resumed from a checkpoint."""
+
+    def __init__(self, result):
+        super().__init__()
+        self.result = result
+
+
+class _JobState:
+    """Pipeline and checkpoints of the job executed by this process."""
+
+    def __init__(self, seed, available, pipeline=None):
+        self.seed = seed
+        self.pipeline = pipeline
+        self.available = [Checkpoint(*checkpoint) for checkpoint in available]
+        self.created = []
+
+
+_job_state = None
+
+
+class _StatementwiseCode:
+    """Stands in for the compiled pipeline, so that it is executed one top-level statement at a time."""
+
+    def __init__(self, module, filename, flags, optimize):
+        self.statements = module.body
+        self.filename = filename
+        self.flags = flags
+        self.optimize = optimize
+        self.digests = _statement_digests(self.statements, _job_state.seed)
+        self.index = 0
+        self.since_checkpoint = time.monotonic()
+
+
+def _statement_digests(statements, seed):
+    """digests[i] identifies statements[:i + 1], including their positions in the source code."""
+    digests = []
+    digest = seed
+    for statement in statements:
+        content = digest + ast.dump(statement, include_attributes=True)
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        digests.append(digest)
+    return digests
+
+
+def _has_future_import(module):
+    # Future imports have to be compiled together with the statements they affect
+    return any(isinstance(statement, ast.ImportFrom) and statement.module == "__future__"
+               for statement in module.body)
+
+
+@contextmanager
+def _statementwise_execution():
+    original_compile, original_exec = builtins.compile, builtins.exec
+
+    def compile_hook(source, filename, mode, flags=0, dont_inherit=False, optimize=-1, **kwargs):
+        if isinstance(source, ast.Module) and mode == "exec" and not _has_future_import(source):
+            builtins.compile = original_compile
+            return _StatementwiseCode(source, filename, flags, optimize)
+        return original_compile(source, filename, mode, flags, dont_inherit, optimize, **kwargs)
+
+    def exec_hook(code, global_scope=None, local_scope=None):
+        if isinstance(code, _StatementwiseCode):
+            builtins.compile, builtins.exec = original_compile, original_exec
+            _run_statements(code, global_scope, local_scope)
+            return None
+        if global_scope is None:
+            caller = sys._getframe(1)
+            global_scope, local_scope = caller.f_globals, caller.f_locals
+        return original_exec(code, global_scope, local_scope)
+
+    builtins.compile, builtins.exec = compile_hook, exec_hook
+    try:
+        yield
+    finally:
+        builtins.compile, builtins.exec = original_compile, original_exec
+
+
+def _run_statements(code, global_scope, local_scope):
+    _resume_from_checkpoint(code)
+    while code.index < len(code.statements):
+        if code.index > 0:
+            _create_checkpoint(code)
+        module = ast.Module(body=[code.statements[code.index]], type_ignores=[])
+        exec(compile(module, code.filename, "exec", code.flags, True, code.optimize), global_scope, local_scope)
+        code.index += 1
+
+
+def limit_native_threads():
+    """Let worker processes that are started from now on use numerical libraries without thread pools."""
+    for variable in _NATIVE_THREAD_VARIABLES:
+        os.environ.setdefault(variable, "1")
+
+
+def _thread_count():
+    """Number of threads of this process, including those started by native libraries."""
+    try:
+        return len(os.listdir("/proc/self/task"))
+    except OSError:
+        return threading.active_count()
+
+
+def _create_checkpoint(code):
+    if len(_job_state.created) >= CHECKPOINT_MAX \
+            or time.monotonic() - code.since_checkpoint < CHECKPOINT_MIN_SECONDS \
+            or _thread_count() > 1:
+        # Forking only copies the current thread, the locks held by others would never be released
+        return
+
+    try:
+        os.makedirs(CHECKPOINT_DIRECTORY, mode=0o700, exist_ok=True)
+    except OSError:
+        return
+    if not is_private_directory(CHECKPOINT_DIRECTORY):
+        # Other users could connect to the checkpoint, or replace it by their own socket
+        return
+    address = os.path.join(CHECKPOINT_DIRECTORY, f"{uuid.uuid4().hex}.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen()
+
+    if os.fork() == 0:
+        # Returns only in a process resumed from this checkpoint
+        _serve_checkpoint(server, address, code)
+        return
+
+    server.close()
+    _job_state.created.append(Checkpoint(code.index, code.digests[code.index - 1], address))
+    code.since_checkpoint = time.monotonic()
+
+
+def _serve_checkpoint(server, address, code):
+    """Wait for executions to resume from this checkpoint, and fork a process for each of them."""
+    jobs.redirect_job_connection(None)
+    # Resumed processes are not waited for
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    server.settimeout(CHECKPOINT_TTL)
+
+    while True:
+        try:
+            client, _ = server.accept()
+        except OSError:
+            # Unused for too long
+            break
+        client.settimeout(None)
+        connection = Connection(client.detach())
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            connection.close()
+            continue
+
+        if request[0] == "close":
+            break
+
+        _, statements, digests, pipeline = request
+        if os.fork() == 0:
+            server.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            jobs.redirect_job_connection(connection)
+            connection.send(os.getpid())
+            code.statements, code.digests = statements, digests
+            _replace_parsed_pipeline(_job_state.pipeline, pipeline)
+            _job_state.pipeline = pipeline
+            code.since_checkpoint = time.monotonic()
+            # This checkpoint was created by the parent, so this process does not know it yet
+            _job_state.created.append(Checkpoint(code.index, digests[code.index - 1], address))
+            if isinstance(sys.stdout, progress.StreamingOutput):
+                # The new job has not seen the progress before this checkpoint yet
+                progress.replay_progress(sys.stdout)
+            return
+        connection.close()
+
+    server.close()
+    os.remove(address)
+    os._exit(0)
+
+
+def _replace_parsed_pipeline(old_pipeline, new_pipeline):
+    """
+    Let mlinspect extract the DAG of the new pipeline in a process resumed from a checkpoint.
+
+    The resumed execution finishes in the frames of the checkpoint, where mlinspect still holds
+    the parsed AST of the pipeline that created it. After the execution, mlinspect extracts the
+    DAG from this AST and no longer uses the source, so the AST is replaced in place.
+    """
+    old_dump = ast.dump(ast.parse(old_pipeline))
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").split(".")[0] == "mlinspect":
+            for value in frame.f_locals.values():
+                if isinstance(value, ast.Module) and ast.dump(value) == old_dump:
+                    value.body = ast.parse(new_pipeline).body
+        frame = frame.f_back
+
+
+def _connect(address):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(address)
+    return Connection(client.detach())
+
+
+def _resume_from_checkpoint(code):
+    """If a checkpoint matches a prefix of the statements, continue the execution there and raise _Resumed."""
+    if not is_private_directory(CHECKPOINT_DIRECTORY):
+        # The sockets could have been created by other users, who would send back the results
+        return
+    matching = [checkpoint for checkpoint in _job_state.available
+                if checkpoint.index <= len(code.digests)
+                and code.digests[checkpoint.index - 1] == checkpoint.digest]
+    for checkpoint in sorted(matching, reverse=True):
+        try:
+            connection = _connect(checkpoint.address)
+            connection.send(("resume", code.statements, code.digests, _job_state.pipeline))
+            resumed_pid = connection.recv()
+        except (OSError, EOFError):
+            # Checkpoint exited in the meantime
+            continue
+        try:
+            _relay_resumed_execution(connection, resumed_pid)
+        except ResumedExecutionError as error:
+            # No statement was executed in this process yet, so it continues with a shorter
+            # prefix or executes the whole pipeline
+            warnings.warn(f"Discarding checkpoint after statement {checkpoint.index}: {error}", RuntimeWarning)
+            _job_state.available.remove(checkpoint)
+            release_checkpoints([checkpoint])
+
+
+def _relay_resumed_execution(connection, resumed_pid):
+    def stop_resumed_execution(signum, frame):
+        os.kill(resumed_pid, signal.SIGTERM)
+        os._exit(1)
+
+    # Cancelling or timing out this job also stops the resumed execution
+    previous_handler = signal.signal(signal.SIGTERM, stop_resumed_execution)
+    try:
+        status, payload = connection.recv()
+        while status == jobs.EVENT:
+            jobs.send_event(*payload)
+            status, payload = connection.recv()
+    except (EOFError, OSError):
+        raise ResumedExecutionError("Execution resumed from checkpoint exited unexpectedly")
+    finally:
+        connection.close()
+        signal.signal(signal.SIGTERM, previous_handler)
+    if status != jobs.DONE:
+        raise ResumedExecutionError(payload)
+    raise _Resumed(payload)
+
+
+def release_checkpoints(checkpoints):
+    """Let checkpoints that are not needed anymore exit."""
+    for checkpoint in checkpoints:
+        try:
+            connection = _connect(Checkpoint(*checkpoint).address)
+            connection.send(("close",))
+            connection.close()
+        except OSError:
+            pass
+
+
+class CheckpointPool:
+    """
+    Checkpoints of the sessions of the server, at most max_checkpoints in total. The checkpoints
+    of the sessions whose executions finished longest ago are released first.
+    """
+
+    def __init__(self, max_checkpoints=32):
+        self.max_checkpoints = max_checkpoints
+        # session_id -> checkpoints
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(checkpoints) for checkpoints in self._sessions.values())
+
+    def update(self, session_id, checkpoints):
+        """Replace the checkpoints of a session after an execution, and return those that are kept."""
+        with self._lock:
+            released = [checkpoint for checkpoint in self._sessions.pop(session_id, ())
+                        if checkpoint not in checkpoints]
+            # The last checkpoints save the most time when resuming
+            kept = list(checkpoints)[max(0, len(checkpoints) - self.max_checkpoints):]
+            released += [checkpoint for checkpoint in checkpoints if checkpoint not in kept]
+            while self._sessions and len(self) + len(kept) > self.max_checkpoints:
+                _, oldest = self._sessions.popitem(last=False)
+                released += oldest
+            self._sessions[session_id] = kept
+        release_checkpoints(released)
+        return kept
+
+    def discard(self, session_id):
+        """Release the checkpoints of a session that expired."""
+        with self._lock:
+            released = self._sessions.pop(session_id, [])
+        release_checkpoints(released)
+
+
+def execute_incrementally(pipeline, checks, inspections, checkpoints=(), preview=None):
+    """
+    Job target that executes the pipeline like execute_inspector_builder, but resumes from
+    one of the given checkpoints of earlier executions if possible.
+
+    Returns the inspector result, the pipeline output, and the checkpoints of this execution.
+    """
+    from . import execute_inspector_builder
+
+    global _job_state
+    if not INCREMENTAL_EXECUTION or not hasattr(os, "fork"):
+        return (*execute_inspector_builder(pipeline, checks, inspections, preview), [])
+
+    # Checkpoints of previews hold sampled data, and must only be resumed by previews on the same sample
+    seed = json.dumps({"checks": checks, "inspections": inspections, "preview": preview},
+                      sort_keys=True, default=repr)
+    _job_state = _JobState(seed, checkpoints, pipeline)
+    try:
+        with _statementwise_execution():
+            inspector_result, pipeline_output = execute_inspector_builder(pipeline, checks, inspections, preview)
+    except _Resumed as resumed:
+        return resumed.result
+    return inspector_result, pipeline_output, list(_job_state.created)
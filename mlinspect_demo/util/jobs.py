@@ -0,0 +1,282 @@
+"""
+Execution of pipelines in separate worker processes.
+
+Jobs are queued and run in at most `max_workers` processes at a time, so that the web
+server threads only submit jobs and poll for their status. Each job runs in its own
+process, which makes it possible to enforce a wall-clock timeout and to cancel a
+running job by terminating its process.
+
+With the "forkserver" start method, worker processes are forked from a server process
+that has imported the heavy modules (TensorFlow, sklearn, mlinspect, ...) once, so
+each execution is isolated without paying for these imports again.
+
+Jobs and their results are kept in the memory of the server process that submitted
+them, so the server has to run as a single process, see session_store.py.
+"""
+import multiprocessing
+import multiprocessing.forkserver
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from multiprocessing.connection import wait
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed out"
+
+# Sent by running jobs to report their progress, see send_event
+EVENT = "event"
+
+FINISHED_STATES = {DONE, FAILED, CANCELLED, TIMED_OUT}
+
+
+class JobQueueFull(Exception):
+    """Raised when submitting a job while the maximum number of jobs is already queued."""
+
+
+class Job:
+    """A function call to be run in a worker process, and its outcome."""
+
+    def __init__(self, job_id, target, args):
+        self.job_id = job_id
+        self.target = target
+        self.args = args
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        # (kind, payload) tuples reported by the job while it was running
+        self.events = []
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self._process = None
+        self._connection = None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def elapsed(self):
+        """Seconds since the job started running, or since it was submitted if it is still pending."""
+        start = self.started_at or self.submitted_at
+        return (self.finished_at or time.monotonic()) - start
+
+
+# Connection to the job manager, in a worker process
+_connection = None
+
+
+def _run_job(connection, target, args):
+    """Entry point of the worker process: run the target and send back its result."""
+    global _connection
+    _connection = connection
+    try:
+        result = target(*args)
+        # Fails before anything is sent if the result cannot be pickled
+        _connection.send((DONE, result))
+    except BaseException:
+        _connection.send((FAILED, traceback.format_exc()))
+    finally:
+        _connection.close()
+
+
+def send_event(kind, payload):
+    """In a worker process, report progress of the running job to the job manager. Does nothing elsewhere."""
+    if _connection is not None:
+        _connection.send((EVENT, (kind, payload)))
+
+
+def redirect_job_connection(connection):
+    """In a process forked from a worker process, send the outcome of the job over another connection."""
+    global _connection
+    if _connection is not None:
+        _connection.close()
+    _connection = connection
+
+
+def create_context(start_method=None, preload=()):
+    """Create the multiprocessing context for worker processes, preloading modules in the fork server."""
+    context = multiprocessing.get_context(start_method)
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload([module for module in preload if module])
+    return context
+
+
+class JobManager:
+    """Bounded pool of worker processes with a job queue, timeouts and cancellation."""
+
+    def __init__(self, max_workers=2, max_pending=32, timeout=600, retention=600, context=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retention = retention
+        self._context = context or multiprocessing.get_context()
+        self._jobs = OrderedDict()
+        self._pending = []
+        self._running = []
+        # Finished jobs whose processes still have to be joined
+        self._stopped = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._monitor = None
+
+    def warm_up(self):
+        """Start the fork server now, so that it has imported the preloaded modules before the first job."""
+        if self._context.get_start_method() == "forkserver":
+            multiprocessing.forkserver.ensure_running()
+
+    def submit(self, target, *args):
+        """Queue a call of target(*args) and return the id of the new job."""
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._pending)} jobs are already waiting to be executed")
+            job = Job(str(uuid.uuid4()), target, args)
+            self._jobs[job.job_id] = job
+            self._pending.append(job)
+            self._ensure_monitor()
+        self._wakeup.set()
+        return job.job_id
+
+    def get(self, job_id):
+        """Return the job with this id, or None if it is unknown or was already forgotten."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a pending job or terminate a running one. Return whether the job was cancelled."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            if job.status == PENDING:
+                self._pending.remove(job)
+            self._finish(job, CANCELLED)
+        self._wakeup.set()
+        return True
+
+    def forget(self, job_id):
+        """
+        Drop a finished job, e.g. after its result has been stored elsewhere.
+
+        Returns the job, or None if it is not finished or was already forgotten, so that
+        only one of several concurrent callers handles the result.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return None
+            return self._jobs.pop(job_id)
+
+    def shutdown(self):
+        """Cancel all jobs and stop the monitor thread."""
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+        monitor, self._monitor = self._monitor, None
+        self._wakeup.set()
+        if monitor is not None:
+            monitor.join()
+
+    def _ensure_monitor(self):
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = threading.Thread(target=self._monitor_jobs, name="job-monitor", daemon=True)
+            self._monitor.start()
+
+    def _monitor_jobs(self):
+        while self._monitor is threading.current_thread():
+            with self._lock:
+                self._reap_stopped()
+                self._start_pending()
+                self._enforce_timeouts()
+                self._forget_expired()
+                running = list(self._running)
+
+            if not running:
+                self._wakeup.wait(1.)
+                self._wakeup.clear()
+                continue
+
+            # Wait for results or exiting processes, but wake up regularly to check the timeouts
+            waitables = [job._connection for job in running] + [job._process.sentinel for job in running]
+            ready = set(wait(waitables, timeout=0.2))
+            for job in running:
+                if job.finished:
+                    # Cancelled in the meantime
+                    continue
+                if job._connection in ready:
+                    self._receive(job)
+                elif job._process.sentinel in ready:
+                    with self._lock:
+                        if not job.finished:
+                            self._finish(job, FAILED,
+                                         error=f"Worker process exited with code {job._process.exitcode}")
+
+    def _start_pending(self):
+        while self._pending and len(self._running) < self.max_workers:
+            job = self._pending.pop(0)
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(target=_run_job, args=(sender, job.target, job.args), daemon=True)
+            process.start()
+            sender.close()
+            job._process, job._connection = process, receiver
+            job.status = RUNNING
+            job.started_at = time.monotonic()
+            self._running.append(job)
+
+    def _enforce_timeouts(self):
+        if not self.timeout:
+            return
+        for job in list(self._running):
+            if job.elapsed > self.timeout:
+                self._finish(job, TIMED_OUT, error=f"Execution exceeded the timeout of {self.timeout} seconds")
+
+    def _forget_expired(self):
+        now = time.monotonic()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > self.retention]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _receive(self, job):
+        # Receive outside of the lock, large results can take a while to unpickle
+        try:
+            status, payload = job._connection.recv()
+        except (EOFError, OSError):
+            status, payload = FAILED, f"Worker process exited with code {job._process.exitcode}"
+        with self._lock:
+            if job.finished:
+                return
+            if status == EVENT:
+                job.events.append(payload)
+            elif status == DONE:
+                self._finish(job, DONE, result=payload)
+            else:
+                self._finish(job, FAILED, error=payload)
+
+    def _finish(self, job, status, result=None, error=None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.monotonic()
+        if job in self._running:
+            self._running.remove(job)
+            if job._process.is_alive():
+                job._process.terminate()
+            self._stopped.append(job)
+
+    def _reap_stopped(self):
+        for job in list(self._stopped):
+            if job._process.is_alive() and time.monotonic() - job.finished_at > 5:
+                # Did not react to SIGTERM
+                job._process.kill()
+            if not job._process.is_alive():
+                job._process.join()
+                job._connection.close()
+                job._process = job._connection = None
+                self._stopped.remove(job)
@@ -0,0 +1,151 @@
+"""
+Level of detail for large DAGs.
+
+Pipelines with hundreds or thousands of operators are mostly made of the transformers
+of sklearn Pipelines and ColumnTransformers. Above a configurable number of nodes, the
+operators whose code reference lies within the source code of such an estimator are
+collapsed into one super-node, which is expanded when it is clicked. The remaining DAG
+is drawn with WebGL, and the node annotations are only shown once the user zoomed in
+far enough, see assets/dag_figure.js.
+"""
+import ast
+from dataclasses import dataclass
+from enum import Enum
+
+import networkx as nx
+
+from .static_dag import StaticCodeReference, _call_name
+
+
+# Annotations are shown when about this many nodes are visible
+ANNOTATION_MAX_VISIBLE_NODES = 100
+
+
+class CollapsedOperatorType(Enum):
+    """Operator types of super-nodes, with the value and short value of an mlinspect operator type."""
+    PIPELINE = ("Pipeline", "P")
+    COLUMN_TRANSFORMER = ("ColumnTransformer", "CT")
+
+    def __new__(cls, value, short_value):
+        member = object.__new__(cls)
+        member._value_ = value
+        member.short_value = short_value
+        return member
+
+
+_COMPOSITE_ESTIMATORS = {
+    "Pipeline": CollapsedOperatorType.PIPELINE,
+    "make_pipeline": CollapsedOperatorType.PIPELINE,
+    "ColumnTransformer": CollapsedOperatorType.COLUMN_TRANSFORMER,
+    "make_column_transformer": CollapsedOperatorType.COLUMN_TRANSFORMER,
+}
+
+
+@dataclass(frozen=True)
+class SuperNode:
+    """Collapsed operators of a Pipeline or ColumnTransformer, drawn like a DagNode."""
+    operator_type: CollapsedOperatorType
+    code_reference: StaticCodeReference
+    description: str = ""
+    # Code references of the estimators to expand when the super-node is clicked
+    spans: tuple = ()
+
+
+def composite_estimator_spans(pipeline):
+    """Operator type and code reference of each Pipeline and ColumnTransformer constructed in the pipeline."""
+    try:
+        tree = ast.parse(pipeline)
+    except SyntaxError:
+        return []
+    return [
+        (_COMPOSITE_ESTIMATORS[_call_name(expr)],
+         StaticCodeReference(expr.lineno, expr.col_offset, expr.end_lineno, expr.end_col_offset))
+        for expr in ast.walk(tree)
+        if isinstance(expr, ast.Call) and _call_name(expr) in _COMPOSITE_ESTIMATORS
+    ]
+
+
+def _contains(outer, inner):
+    return (outer.lineno, outer.col_offset) <= (inner.lineno, inner.col_offset) \
+        and (inner.end_lineno, inner.end_col_offset) <= (outer.end_lineno, outer.end_col_offset)
+
+
+def collapse_subgraphs(G, spans, expanded=()):
+    """
+    Replace the nodes of G within the code reference of each estimator by a SuperNode, unless the
+    code reference is expanded. Nested estimators are collapsed into the outermost collapsed one,
+    and estimators whose super-nodes would be on a cycle into a single one.
+
+    Returns the collapsed DAG and the super-node of each collapsed node of G.
+    """
+    # Outermost spans first
+    spans = sorted(((operator_type, span) for operator_type, span in spans if span not in expanded),
+                   key=lambda item: (item[1].lineno, item[1].col_offset,
+                                     -item[1].end_lineno, -item[1].end_col_offset))
+    members = {}
+    for node in G.nodes:
+        code_reference = node.code_reference
+        for item in spans:
+            if _contains(item[1], code_reference):
+                members.setdefault(item, []).append(node)
+                break
+
+    groups = [(operator_type, (span,), nodes) for (operator_type, span), nodes in members.items()
+              # A single operator is drawn as it is
+              if len(nodes) > 1]
+    while True:
+        representatives = {}
+        for operator_type, group_spans, nodes in groups:
+            super_node = SuperNode(operator_type, group_spans[0], f"{len(nodes)} operators, click to expand",
+                                   group_spans)
+            representatives.update({node: super_node for node in nodes})
+        H = _condense(G, representatives)
+        merged = _merge_cycles(H, groups)
+        if merged is None:
+            return H, representatives
+        groups = merged
+
+
+def _condense(G, representatives):
+    H = type(G)()
+    for node in G.nodes:
+        H.add_node(representatives.get(node, node))
+    for parent, child in G.edges:
+        parent, child = representatives.get(parent, parent), representatives.get(child, child)
+        if parent != child:
+            H.add_edge(parent, child)
+    return H
+
+
+def _merge_cycles(H, groups):
+    """
+    Merge groups whose super-nodes are on a cycle, e.g. a ColumnTransformer and a Pipeline of it that is
+    constructed separately. Returns the merged groups, or None if no super-node is on a cycle.
+    """
+    group_of = {group[1]: group for group in groups}
+    merged_spans = set()
+    merged_groups = []
+    for component in nx.strongly_connected_components(H):
+        super_nodes = [node for node in component if isinstance(node, SuperNode)]
+        if len(component) == 1 or not super_nodes:
+            continue
+        # The largest estimator stands for all of them, the nodes in between are collapsed too
+        cycle_groups = sorted((group_of[node.spans] for node in super_nodes), key=lambda group: -len(group[2]))
+        nodes = [node for node in component if not isinstance(node, SuperNode)]
+        nodes += [node for _, _, group_nodes in cycle_groups for node in group_nodes]
+        spans = tuple(span for _, group_spans, _ in cycle_groups for span in group_spans)
+        merged_groups.append((cycle_groups[0][0], spans, nodes))
+        merged_spans.update(group_spans for _, group_spans, _ in cycle_groups)
+    if not merged_groups:
+        return None
+    return [group for group in groups if group[1] not in merged_spans] + merged_groups
+
+
+def annotation_max_range(pos_dict):
+    """Width of the visible x range below which annotations are shown, see assets/dag_figure.js."""
+    if not pos_dict:
+        return 0.
+    xs, ys = zip(*pos_dict.values())
+    # A DAG that is a single column is as wide as it is high when it is shown
+    width = (max(xs) - min(xs)) or (max(ys) - min(ys))
+    return width * min(1., (ANNOTATION_MAX_VISIBLE_NODES / max(1, len(pos_dict))) ** 0.5)
@@ -0,0 +1,201 @@
+"""
+Layered (Sugiyama) layout of DAGs in pure Python and NumPy.
+
+An alternative to graphviz dot that runs in process, in the same steps:
+1. Longest-path layering, with sources moved down next to their first child
+2. Dummy nodes on edges that span multiple layers
+3. Crossing reduction with alternating barycentric sweeps, keeping the best ordering
+4. Coordinate assignment that places each node as close as possible to the mean of its
+   neighbours, keeping the order and a minimum distance within each layer
+
+Positions are returned like the ones of nx.nx_agraph.graphviz_layout: {node: (x, y)},
+with the sources at the top, i.e. with the highest y.
+"""
+import networkx as nx
+import numpy as np
+
+
+NODE_SEPARATION = 100.
+RANK_SEPARATION = 100.
+CROSSING_REDUCTION_SWEEPS = 12
+COORDINATE_SWEEPS = 4
+
+# Maximum number of edge pairs compared at once when counting crossings
+_CHUNK_PAIRS = 2**22
+
+
+def _acyclic_edges(G, index):
+    """Edges between node indices, with edges that close a cycle reversed."""
+    edges = [(index[u], index[v]) for u, v in G.edges if u != v]
+    if nx.is_directed_acyclic_graph(G):
+        return edges
+    order = {index[node]: position for position, node in enumerate(nx.dfs_preorder_nodes(G))}
+    return [(u, v) if order[u] < order[v] else (v, u) for u, v in edges]
+
+
+def _longest_path_layers(num_nodes, edges):
+    H = nx.DiGraph()
+    H.add_nodes_from(range(num_nodes))
+    H.add_edges_from(edges)
+    layers = np.zeros(num_nodes, dtype=np.int64)
+    for node in nx.topological_sort(H):
+        for child in H.successors(node):
+            layers[child] = max(layers[child], layers[node] + 1)
+    # Sources, e.g. data sources, are placed right above their first child instead of in the top layer
+    for node in range(num_nodes):
+        children = list(H.successors(node))
+        if children and H.in_degree(node) == 0:
+            layers[node] = min(layers[child] for child in children) - 1
+    return layers
+
+
+def _add_dummy_nodes(layers, edges):
+    """Split edges that span multiple layers into chains of dummy nodes. Returns layers and edges of all nodes."""
+    layers = list(layers)
+    proper_edges = []
+    for u, v in edges:
+        previous = u
+        for layer in range(layers[u] + 1, layers[v]):
+            dummy = len(layers)
+            layers.append(layer)
+            proper_edges.append((previous, dummy))
+            previous = dummy
+        proper_edges.append((previous, v))
+    return np.array(layers, dtype=np.int64), np.array(proper_edges, dtype=np.int64).reshape(-1, 2)
+
+
+def _count_layer_crossings(upper_positions, lower_positions):
+    """Number of crossings between the edges of two adjacent layers, given the positions of their endpoints."""
+    crossings = 0
+    chunk = max(1, _CHUNK_PAIRS // max(1, len(upper_positions)))
+    for start in range(0, len(upper_positions), chunk):
+        rows = slice(start, start + chunk)
+        crossings += int(np.count_nonzero(
+            (upper_positions[rows, None] < upper_positions[None, :])
+            & (lower_positions[rows, None] > lower_positions[None, :])
+        ))
+    return crossings
+
+
+def _total_crossings(positions, layer_edges):
+    return sum(_count_layer_crossings(positions[upper], positions[lower]) for upper, lower in layer_edges)
+
+
+def _barycenter_sweep(positions, layer_nodes, layer_edges, downwards):
+    layer_range = range(1, len(layer_nodes)) if downwards else range(len(layer_nodes) - 2, -1, -1)
+    for layer in layer_range:
+        nodes = layer_nodes[layer]
+        upper, lower = layer_edges[layer - 1] if downwards else layer_edges[layer]
+        fixed, free = (upper, lower) if downwards else (lower, upper)
+        degree = np.bincount(free, minlength=len(positions))[nodes]
+        total = np.bincount(free, weights=positions[fixed], minlength=len(positions))[nodes]
+        # Nodes without neighbours in the fixed layer keep their position
+        barycenters = np.where(degree > 0, total / np.maximum(degree, 1), positions[nodes])
+        order = np.lexsort((positions[nodes], barycenters))
+        positions[nodes[order]] = np.arange(len(nodes))
+
+
+def _reduce_crossings(positions, layer_nodes, layer_edges):
+    best_positions = positions.copy()
+    best_crossings = _total_crossings(positions, layer_edges)
+    for sweep in range(CROSSING_REDUCTION_SWEEPS):
+        if best_crossings == 0:
+            break
+        _barycenter_sweep(positions, layer_nodes, layer_edges, downwards=sweep % 2 == 0)
+        crossings = _total_crossings(positions, layer_edges)
+        if crossings < best_crossings:
+            best_positions, best_crossings = positions.copy(), crossings
+    return best_positions
+
+
+def _place_in_order(desired, separation):
+    """
+    Coordinates closest to the desired ones (least squares) that keep their order and the minimum separation,
+    by isotonic regression with the pool adjacent violators algorithm.
+    """
+    targets = desired - separation * np.arange(len(desired))
+    # Blocks of pooled values: [mean, count]
+    blocks = []
+    for target in targets:
+        blocks.append([target, 1])
+        while len(blocks) > 1 and blocks[-2][0] > blocks[-1][0]:
+            mean, count = blocks.pop()
+            blocks[-1][0] = (blocks[-1][0] * blocks[-1][1] + mean * count) / (blocks[-1][1] + count)
+            blocks[-1][1] += count
+    pooled = np.repeat([mean for mean, _ in blocks], [count for _, count in blocks])
+    return pooled + separation * np.arange(len(desired))
+
+
+def _assign_coordinates(positions, layer_nodes, layer_edges):
+    x = positions * NODE_SEPARATION
+    for sweep in range(COORDINATE_SWEEPS):
+        downwards = sweep % 2 == 0
+        layer_range = range(1, len(layer_nodes)) if downwards else range(len(layer_nodes) - 2, -1, -1)
+        for layer in layer_range:
+            nodes = layer_nodes[layer][np.argsort(positions[layer_nodes[layer]])]
+            upper, lower = layer_edges[layer - 1] if downwards else layer_edges[layer]
+            fixed, free = (upper, lower) if downwards else (lower, upper)
+            degree = np.bincount(free, minlength=len(x))[nodes]
+            total = np.bincount(free, weights=x[fixed], minlength=len(x))[nodes]
+            desired = np.where(degree > 0, total / np.maximum(degree, 1), x[nodes])
+            x[nodes] = _place_in_order(desired, NODE_SEPARATION)
+    return x - x.min() + NODE_SEPARATION / 2
+
+
+def layered_layout(G):
+    """Compute the position of each node of G, see the module docstring."""
+    nodes = list(G.nodes)
+    if not nodes:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = _acyclic_edges(G, index)
+
+    layers, proper_edges = _add_dummy_nodes(_longest_path_layers(len(nodes), edges), edges)
+    num_layers = int(layers.max()) + 1
+    layer_nodes = [np.flatnonzero(layers == layer) for layer in range(num_layers)]
+    edge_layers = layers[proper_edges[:, 0]]
+    # layer_edges[i]: upper and lower endpoints of the edges between layer i and i + 1
+    layer_edges = [(proper_edges[edge_layers == layer, 0], proper_edges[edge_layers == layer, 1])
+                   for layer in range(num_layers - 1)]
+
+    # Initially in insertion order, with the dummy nodes of an edge after the real nodes
+    positions = np.zeros(len(layers))
+    for layer in layer_nodes:
+        positions[layer] = np.arange(len(layer))
+    positions = _reduce_crossings(positions, layer_nodes, layer_edges)
+
+    x = _assign_coordinates(positions, layer_nodes, layer_edges)
+    y = (num_layers - 1 - layers) * RANK_SEPARATION + RANK_SEPARATION / 2
+    return {node: (float(x[i]), float(y[i])) for i, node in enumerate(nodes)}
+
+
+def count_crossings(G, pos_dict):
+    """Number of pairs of edges of G that cross when drawn as straight lines between the given positions."""
+    edges = [(u, v) for u, v in G.edges if u != v]
+    if len(edges) < 2:
+        return 0
+    index = {node: i for i, node in enumerate(G.nodes)}
+    starts = np.array([pos_dict[u] for u, _ in edges], dtype=float)
+    ends = np.array([pos_dict[v] for _, v in edges], dtype=float)
+    start_ids = np.array([index[u] for u, _ in edges])
+    end_ids = np.array([index[v] for _, v in edges])
+
+    def orientation(a, b, c):
+        return np.sign((b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1])
+                       - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0]))
+
+    crossings = 0
+    chunk = max(1, _CHUNK_PAIRS // len(edges))
+    for start in range(0, len(edges), chunk):
+        rows = slice(start, start + chunk)
+        a, b = starts[rows, None], ends[rows, None]
+        c, d = starts[None, :], ends[None, :]
+        crossing = (orientation(a, b, c) * orientation(a, b, d) < 0) \
+            & (orientation(c, d, a) * orientation(c, d, b) < 0)
+        # Edges with a common node only touch
+        crossing &= (start_ids[rows, None] != start_ids[None, :]) & (start_ids[rows, None] != end_ids[None, :]) \
+            & (end_ids[rows, None] != start_ids[None, :]) & (end_ids[rows, None] != end_ids[None, :])
+        # Count each pair once
+        crossing &= np.arange(start, min(start + chunk, len(edges)))[:, None] < np.arange(len(edges))[None, :]
+        crossings += int(np.count_nonzero(crossing))
+    return crossings
@@ -0,0 +1,148 @@
+"""
+Cache for the positions of DAG nodes computed by the layout engine.
+
+Layouts are keyed on a canonical structural hash of the DAG: the operator type,
+description and code reference of every node together with the edges between them.
+Nodes are matched by labels from a Weisfeiler-Lehman style refinement of their own
+attributes with the ones of their neighbours, so a structurally identical DAG of a
+new execution (with new DagNode objects) gets the positions of the cached one.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Rounds of label refinement, nodes that are still not distinguished after it are interchangeable
+_REFINEMENT_ROUNDS = 3
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def node_signature(node):
+    """Operator type, description and code reference of a DAG node."""
+    code_reference = node.code_reference
+    return repr((node.operator_type.value, node.description or "", code_reference.lineno,
+                 code_reference.col_offset, code_reference.end_lineno, code_reference.end_col_offset))
+
+
+def canonical_labels(G):
+    """Label each node with its signature, refined by the labels of its predecessors and successors."""
+    labels = {node: _digest(node_signature(node)) for node in G.nodes}
+    for _ in range(_REFINEMENT_ROUNDS):
+        labels = {
+            node: _digest("|".join([
+                labels[node],
+                ",".join(sorted(labels[parent] for parent in G.predecessors(node))),
+                ",".join(sorted(labels[child] for child in G.successors(node))),
+            ]))
+            for node in G.nodes
+        }
+    return labels
+
+
+def structural_hash(G, labels=None):
+    """Hash of the nodes and edges of the DAG that does not depend on the node objects or their order."""
+    if labels is None:
+        labels = canonical_labels(G)
+    content = json.dumps({
+        "nodes": sorted(labels.values()),
+        "edges": sorted([labels[parent], labels[child]] for parent, child in G.edges),
+    })
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LayoutCache:
+    """
+    Thread-safe LRU cache of DAG layouts, optionally persisted in a directory. At most max_entries
+    layouts are kept in memory and at most max_files in the directory, both least recently used first.
+    """
+
+    def __init__(self, max_entries=64, directory=None, max_files=4096):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_files = max_files
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # structural hash -> {node label: [positions of the nodes with this label]}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def layout(self, G, compute_layout, engine=""):
+        """
+        Return the positions of the nodes of G, calling compute_layout(G) only if no identical DAG
+        was laid out by the same engine before.
+        """
+        labels = canonical_labels(G)
+        key = _digest(engine + structural_hash(G, labels))
+        positions = self._get(key)
+        if positions is not None:
+            remaining = {label: list(label_positions) for label, label_positions in positions.items()}
+            return {node: tuple(remaining[labels[node]].pop(0)) for node in G.nodes}
+
+        pos_dict = compute_layout(G)
+        positions = {}
+        for node in G.nodes:
+            positions.setdefault(labels[node], []).append(list(pos_dict[node]))
+        self._put(key, positions)
+        return pos_dict
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key)) as file:
+                positions = json.load(file)
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._store(key, positions)
+        return positions
+
+    def _put(self, key, positions):
+        with self._lock:
+            self._store(key, positions)
+        if self.directory:
+            temporary = f"{self._path(key)}.{os.getpid()}.tmp"
+            try:
+                with open(temporary, "w") as file:
+                    json.dump(positions, file)
+                os.replace(temporary, self._path(key))
+            except OSError as e:
+                print(f"[layout] Could not persist layout {key}: {e}")
+            self._evict_files()
+
+    def _store(self, key, positions):
+        # Only the copy in memory is evicted, the persisted file is limited by _evict_files
+        self._entries[key] = positions
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_files(self):
+        files = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(".json"):
+                    files.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            return
+        for _, path in sorted(files)[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
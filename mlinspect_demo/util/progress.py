@@ -0,0 +1,113 @@
+"""
+Live progress of pipeline executions in worker processes.
+
+While a pipeline is executed, its stdout and every operator call that mlinspect instruments
+are sent to the job manager as job events, so that the UI can show them before the execution
+is finished. mlinspect only extracts the DAG after the execution, so operators are reported
+from its instrumentation hooks as each call returns. Outside of worker processes, nothing is sent.
+"""
+import io
+import time
+from contextlib import contextmanager
+
+from . import jobs
+
+
+OUTPUT = "output"
+OPERATOR = "operator"
+
+# Minimum seconds between two output events, to not send every single write
+_OUTPUT_INTERVAL = 0.1
+
+# Operator events sent so far, and the code references of their calls
+_reported_operators = []
+_reported_code_references = set()
+
+
+class StreamingOutput(io.StringIO):
+    """Captures stdout like StringIO, and sends completed lines as output events."""
+
+    def __init__(self):
+        super().__init__()
+        self._sent = 0
+        self._last_sent_at = 0.
+
+    def write(self, text):
+        written = super().write(text)
+        if "\n" in text and time.monotonic() - self._last_sent_at >= _OUTPUT_INTERVAL:
+            self.flush()
+        return written
+
+    def flush(self):
+        super().flush()
+        value = self.getvalue()
+        if len(value) > self._sent:
+            jobs.send_event(OUTPUT, value[self._sent:])
+            self._sent = len(value)
+            self._last_sent_at = time.monotonic()
+
+    def replay(self):
+        """Send all output captured so far again."""
+        self._sent = 0
+        self.flush()
+
+
+def _instrumented_operator(backends, code_reference):
+    """
+    Operator type and description of the call at the code reference, from the backend that
+    instrumented it, or None if the call is not an operator.
+    """
+    for backend in backends:
+        function_info = backend.code_reference_to_module.get(code_reference)
+        if function_info is None:
+            continue
+        # Keys with a third element distinguish operators that are only told apart in the DAG
+        for key, operator_type in backend.operator_map.items():
+            if tuple(key[:2]) == tuple(function_info):
+                return operator_type, backend.code_reference_to_description.get(code_reference)
+    return None
+
+
+def _report_operator(backends, code_reference):
+    if code_reference in _reported_code_references:
+        return
+    operator = _instrumented_operator(backends, code_reference)
+    if operator is None:
+        return
+    operator_type, description = operator
+    _reported_code_references.add(code_reference)
+    payload = {
+        "operator": operator_type.value,
+        "lineno": code_reference.lineno,
+        "description": description or "",
+    }
+    _reported_operators.append(payload)
+    jobs.send_event(OPERATOR, payload)
+
+
+@contextmanager
+def report_operators():
+    """Send an operator event for each call that mlinspect instruments as an operator, once it returned."""
+    from mlinspect.instrumentation._pipeline_executor import PipelineExecutor
+
+    original_after_call_used = PipelineExecutor.after_call_used
+
+    def after_call_used(executor, subscript, call_code, return_value, code_reference):
+        return_value = original_after_call_used(executor, subscript, call_code, return_value, code_reference)
+        _report_operator(executor.backends, code_reference)
+        return return_value
+
+    _reported_operators.clear()
+    _reported_code_references.clear()
+    PipelineExecutor.after_call_used = after_call_used
+    try:
+        yield
+    finally:
+        PipelineExecutor.after_call_used = original_after_call_used
+
+
+def replay_progress(output):
+    """Send the output and operators so far again, e.g. when a new job resumes from a checkpoint."""
+    output.replay()
+    for payload in _reported_operators:
+        jobs.send_event(OPERATOR, payload)
@@ -0,0 +1,161 @@
+"""
+Content-addressed cache for pipeline execution results.
+
+Entries are keyed on a hash of the normalized pipeline source together with the
+inspection and check configuration. The least recently used entries are evicted
+once either the number of entries or their total estimated size exceeds its limit.
+"""
+import hashlib
+import json
+import sys
+import threading
+import types
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+CachedExecution = namedtuple("CachedExecution", [
+    "pipeline",
+    "inspector_result",
+    "pipeline_output",
+    "pos_dict",
+    # Graph data of the DAG, which the browser draws as a plotly figure: columnar node arrays in the
+    # order of their IDs, edges and problem node IDs, see build_graph_data and assets/dag_figure.js
+    "figure",
+    # Samples of the input data that the pipeline was executed on, or None for all data, see preview_settings
+    "preview",
+    # Node ID -> DagNode, the IDs are the positions of the nodes in the arrays of the graph data. The
+    # browser sends them back as the first element of the customdata of the clicked or selected point
+    "node_index",
+    # Code references of the expanded Pipelines and ColumnTransformers of a large DAG, see large_dag.py
+    "expanded",
+    # Unique ID of this rendering of the result, to cache the details of its nodes
+    "result_id",
+], defaults=[None, None, (), None])
+
+
+# Maximum number of objects visited by estimate_size
+ESTIMATE_MAX_OBJECTS = 10000
+
+# Shared by many objects and not owned by any of them, e.g. the classes and functions of Keras models
+_NOT_OWNED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def normalize_pipeline(pipeline):
+    """
+    Normalize line endings and trailing whitespace.
+
+    Leading lines and indentation are kept as they are, so that the code references
+    of a cached result still point to the right place in the source code.
+    """
+    lines = pipeline.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).rstrip("\n")
+
+
+def execution_cache_key(pipeline, checks, inspections, preview=None):
+    """Hash the normalized pipeline source, the inspection/check configuration and the preview columns."""
+    content = json.dumps({
+        "pipeline": normalize_pipeline(pipeline),
+        "checks": checks,
+        "inspections": inspections,
+        "preview": preview,
+    }, sort_keys=True, default=repr)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def expanded_cache_key(execution_key, spans):
+    """Hash the key of a cached execution together with the code references of the estimators it expands."""
+    content = repr((execution_key, tuple(spans)))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def estimate_size(obj, max_objects=ESTIMATE_MAX_OBJECTS):
+    """
+    Roughly estimate the memory held by an object graph, in bytes. At most max_objects objects
+    are visited, e.g. the weights of a model inside an inspector result are not all counted.
+    """
+    size = 0
+    seen = set()
+    stack = [obj]
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _NOT_OWNED):
+            continue
+        seen.add(id(current))
+
+        if isinstance(current, (pd.DataFrame, pd.Series, pd.Index)):
+            usage = current.memory_usage(deep=True)
+            size += int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+            continue
+        if isinstance(current, np.ndarray):
+            size += current.nbytes
+            if current.dtype == object:
+                stack.extend(current.ravel()[:max_objects])
+            continue
+
+        size += sys.getsizeof(current, 0)
+        if isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, "__dict__"):
+            stack.append(vars(current))
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by number of entries and total estimated size."""
+
+    def __init__(self, max_entries=16, max_bytes=512 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """Return the cached entry for this key, or None, and mark it as recently used."""
+        with self._lock:
+            try:
+                entry, _ = self._entries[key]
+            except KeyError:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, size=None):
+        """Store an entry, evicting the least recently used entries if over budget."""
+        if size is None:
+            size = estimate_size(entry)
+        if size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (entry, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
@@ -0,0 +1,79 @@
+"""
+Preview executions on stratified row samples of the input data.
+
+In preview mode, every DataFrame that the pipeline loads with pd.read_csv and that
+contains one of the sensitive columns is replaced by a sample of at most `max_rows`
+rows. The sample is stratified on the sensitive columns, i.e. each combination of
+their values keeps its share of the rows (and at least one row), so that histograms
+and the distribution changes checked by NoBiasIntroducedFor stay representative.
+
+Frames without sensitive columns are loaded completely, so that joins with a sampled
+frame do not lose additional rows. If no sensitive columns are selected, all frames
+are sampled uniformly.
+"""
+import functools
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+# Fixed, so that previews of the same pipeline use the same rows
+SAMPLE_SEED = 42
+
+
+def sample_settings(sensitive_columns, max_rows):
+    """Describe the samples of a preview, previews with equal settings are executed on the same rows."""
+    return {"sensitive_columns": sorted(sensitive_columns), "max_rows": max_rows, "seed": SAMPLE_SEED}
+
+
+def stratified_sample(frame, columns, max_rows, seed=SAMPLE_SEED):
+    """Return a sample of about max_rows rows of the frame, stratified on the given columns, in the original order."""
+    num_rows = len(frame)
+    if num_rows <= max_rows:
+        return frame
+
+    if columns:
+        strata = frame.groupby(list(columns), sort=False, dropna=False).ngroup().to_numpy()
+    else:
+        strata = np.zeros(num_rows, dtype=np.int64)
+    stratum_sizes = np.bincount(strata)
+    quotas = np.maximum(np.round(stratum_sizes * (max_rows / num_rows)), 1).astype(np.int64)
+
+    # Pick the rows with the lowest random keys within each stratum
+    keys = np.random.default_rng(seed).random(num_rows)
+    order = np.lexsort((keys, strata))
+    stratum_starts = np.concatenate([[0], np.cumsum(stratum_sizes)[:-1]])
+    sorted_strata = strata[order]
+    rank_in_stratum = np.arange(num_rows) - stratum_starts[sorted_strata]
+    selected = np.sort(order[rank_in_stratum < quotas[sorted_strata]])
+    sample = frame.iloc[selected]
+    if isinstance(frame.index, pd.RangeIndex):
+        # Like a frame read from a smaller file
+        sample = sample.reset_index(drop=True)
+    return sample
+
+
+@contextmanager
+def sampled_read_csv(sensitive_columns, max_rows):
+    """Make pd.read_csv return stratified samples of the frames with sensitive columns."""
+    original_read_csv = pd.read_csv
+    sensitive_columns = list(sensitive_columns or [])
+
+    # mlinspect recognizes pd.read_csv by the module of the function
+    @functools.wraps(original_read_csv)
+    def read_csv(*args, **kwargs):
+        frame = original_read_csv(*args, **kwargs)
+        if not isinstance(frame, pd.DataFrame):
+            # e.g. iterator or chunksize
+            return frame
+        columns = [column for column in sensitive_columns if column in frame.columns]
+        if sensitive_columns and not columns:
+            return frame
+        return stratified_sample(frame, columns, max_rows)
+
+    pd.read_csv = read_csv
+    try:
+        yield
+    finally:
+        pd.read_csv = original_read_csv
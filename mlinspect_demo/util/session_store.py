@@ -0,0 +1,219 @@
+"""
+Per-session state of the user interface.
+
+Each browser session gets its own id (see the "session-id" store in the layout), so
+concurrent users never see each other's results. A session refers to its execution
+result by its key in the result cache, which holds the result itself. Sessions expire
+after a time to live and the least recently used ones are evicted from memory once
+their total estimated size exceeds the memory budget. If a directory is configured,
+sessions are also written there, so that they survive eviction and server restarts.
+
+Jobs and execution results are kept in the memory of the server process, so the
+server has to run as a single process. The session directory is locked by the first
+process that uses it.
+"""
+import fcntl
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .result_cache import estimate_size
+
+
+# Session fields whose size is estimated, the others are small
+_SIZED_FIELDS = {"static_pipeline", "static_pos_dict", "static_node_index", "checkpoints"}
+
+# Session fields that are not persisted, jobs do not survive the server process
+_TRANSIENT_FIELDS = {"job_id", "job_cache_key", "job_pipeline", "job_sensitive_columns", "job_preview"}
+
+
+class Session:
+    """State of one browser session."""
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        # Result cache key of the shown execution
+        self.execution_key = None
+        # Static DAG preview that is shown instead of the results, see static_dag.py
+        self.static_pipeline = None
+        self.static_pos_dict = None
+        self.static_node_index = None
+        # Checkpoints of the last execution, see incremental.py
+        self.checkpoints = []
+        # Execution that is currently queued or running
+        self.job_id = None
+        self.job_cache_key = None
+        self.job_pipeline = None
+        self.job_sensitive_columns = None
+        self.job_preview = None
+
+    def __getstate__(self):
+        return {name: value for name, value in vars(self).items() if name not in _TRANSIENT_FIELDS}
+
+    def __setstate__(self, state):
+        self.__init__(state["session_id"])
+        vars(self).update(state)
+
+
+class SessionStore:
+    """Thread-safe session storage with time to live and memory-bounded eviction."""
+
+    def __init__(self, ttl=3600, max_bytes=1024 * 2**20, directory=None, on_discard=None):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory = directory
+        # Called with the id of a session that expired, or was evicted and is not persisted
+        self.on_discard = on_discard
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock_file = None
+        # session_id -> [session, size, last access time, modification time of persisted file]
+        self._sessions = OrderedDict()
+        self._total_bytes = 0
+        self._last_directory_sweep = 0.
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, session_id):
+        """Return the session with this id, creating an empty one if it does not exist (anymore)."""
+        with self._lock:
+            self.evict_expired()
+            entry = self._sessions.get(session_id)
+            persisted_mtime = self._persisted_mtime(session_id)
+            if entry is not None and (persisted_mtime is None or persisted_mtime <= entry[3]):
+                entry[2] = time.monotonic()
+                self._sessions.move_to_end(session_id)
+                return entry[0]
+
+            # Not in memory, or updated by another process in the meantime
+            session = self._load(session_id) if persisted_mtime is not None else None
+            if session is None:
+                session = Session(session_id)
+            self._insert(session, persisted_mtime or 0.)
+            return session
+
+    def update(self, session_id, **state):
+        """
+        Set attributes of a session. Its size is estimated again, and it is persisted, only
+        if fields changed that affect them.
+        """
+        with self._lock:
+            session = self.get(session_id)
+            changed = {name for name, value in state.items() if getattr(session, name) is not value}
+            for name, value in state.items():
+                setattr(session, name, value)
+            if changed - _TRANSIENT_FIELDS:
+                persisted_mtime = self._persist(session)
+            else:
+                persisted_mtime = self._sessions[session_id][3]
+            if changed & _SIZED_FIELDS:
+                self._insert(session, persisted_mtime)
+            else:
+                self._sessions[session_id][3] = persisted_mtime
+            return session
+
+    def remove(self, session_id):
+        with self._lock:
+            self._drop(session_id)
+            if self.on_discard is not None:
+                self.on_discard(session_id)
+            if self.directory:
+                try:
+                    os.remove(self._path(session_id))
+                except FileNotFoundError:
+                    pass
+
+    def evict_expired(self):
+        """Remove all sessions that were not accessed within the time to live."""
+        with self._lock:
+            deadline = time.monotonic() - self.ttl
+            expired = [session_id for session_id, entry in self._sessions.items() if entry[2] < deadline]
+            for session_id in expired:
+                self.remove(session_id)
+
+            if self.directory and time.monotonic() - self._last_directory_sweep > 60:
+                self._last_directory_sweep = time.monotonic()
+                wall_deadline = time.time() - self.ttl
+                for file_name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, file_name)
+                    try:
+                        if file_name.endswith(".pickle") and os.path.getmtime(path) < wall_deadline:
+                            os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    def _insert(self, session, persisted_mtime):
+        self._drop(session.session_id)
+        size = estimate_size([getattr(session, name) for name in _SIZED_FIELDS])
+        self._sessions[session.session_id] = [session, size, time.monotonic(), persisted_mtime]
+        self._total_bytes += size
+        # Evict least recently used sessions from memory, but always keep the current one
+        while self._total_bytes > self.max_bytes and len(self._sessions) > 1:
+            evicted_id = next(iter(self._sessions))
+            self._drop(evicted_id)
+            if not self.directory and self.on_discard is not None:
+                self.on_discard(evicted_id)
+
+    def _drop(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+
+    def _path(self, session_id):
+        # Session ids come from the client, so never use them as a path directly
+        safe_id = "".join(c for c in str(session_id) if c.isalnum() or c == "-")
+        return os.path.join(self.directory, f"{safe_id}.pickle")
+
+    def _lock_directory(self):
+        """Make sure that no other server process uses the session directory."""
+        if self._lock_file is not None:
+            return
+        lock_file = open(os.path.join(self.directory, "server.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(f"The session directory {self.directory} is used by another server process. "
+                               "Jobs and results are kept in memory, so the server has to run as a single process.")
+        self._lock_file = lock_file
+
+    def _persisted_mtime(self, session_id):
+        if not self.directory:
+            return None
+        self._lock_directory()
+        try:
+            return os.path.getmtime(self._path(session_id))
+        except FileNotFoundError:
+            return None
+
+    def _persist(self, session):
+        if not self.directory:
+            return 0.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                pickle.dump(session, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(session.session_id))
+        except Exception as e:
+            print(f"[session] Could not persist session {session.session_id}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return 0.
+        return os.path.getmtime(self._path(session.session_id))
+
+    def _load(self, session_id):
+        try:
+            with open(self._path(session_id), "rb") as session_file:
+                return pickle.load(session_file)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"[session] Could not load session {session_id}: {e}")
+            return None
@@ -0,0 +1,121 @@
+"""
+Incremental layout of a DAG that keeps the positions of the nodes of a previous layout.
+
+After a small edit of the pipeline, most operators of the new DAG are the same as before.
+They are matched with the nodes of the previous layout by operator type, description and
+code reference, and keep their positions. If lines were inserted or removed above an
+operator, it is matched with the same operator on a shifted line. Only the remaining,
+inserted or changed nodes are placed: next to their already placed parents or children,
+in the first free slot of that layer. Nodes that end up on the layer of a parent or above
+it are then moved below their parents, together with their descendants. If too much
+changed, the whole DAG is laid out again.
+"""
+from collections import defaultdict
+
+import networkx as nx
+import numpy as np
+
+from .layout_cache import node_signature
+
+
+# Maximum fraction of new or changed nodes for which the previous layout is kept
+MAX_CHANGED_FRACTION = 0.5
+
+_DEFAULT_SEPARATION = 100.
+
+
+def _shift_invariant_signature(node):
+    code_reference = node.code_reference
+    return repr((node.operator_type.value, node.description or "", code_reference.col_offset,
+                 code_reference.end_lineno - code_reference.lineno, code_reference.end_col_offset))
+
+
+def match_nodes(G, previous_pos_dict):
+    """Map nodes of G to positions of equal nodes of the previous layout."""
+    matched = {}
+    unmatched_previous = list(previous_pos_dict)
+    for signature in (node_signature, _shift_invariant_signature):
+        candidates = defaultdict(list)
+        for previous_node in unmatched_previous:
+            candidates[signature(previous_node)].append(previous_node)
+        # Nodes with equal signatures are matched in order
+        for node in G.nodes:
+            if node not in matched and candidates[signature(node)]:
+                matched[node] = candidates[signature(node)].pop(0)
+        unmatched_previous = [previous_node for previous_nodes in candidates.values()
+                              for previous_node in previous_nodes]
+    return {node: previous_pos_dict[previous_node] for node, previous_node in matched.items()}
+
+
+def _separations(G, pos_dict):
+    """Distance between layers and between neighbouring nodes of a layer in the layout."""
+    rank_gaps = [pos_dict[u][1] - pos_dict[v][1] for u, v in G.edges
+                 if u in pos_dict and v in pos_dict and pos_dict[u][1] > pos_dict[v][1]]
+    layers = defaultdict(list)
+    for x, y in pos_dict.values():
+        layers[y].append(x)
+    node_gaps = [gap for xs in layers.values() for gap in np.diff(sorted(xs)) if gap > 0]
+    rank_separation = float(np.min(rank_gaps)) if rank_gaps else _DEFAULT_SEPARATION
+    node_separation = float(np.min(node_gaps)) if node_gaps else _DEFAULT_SEPARATION
+    return rank_separation, node_separation
+
+
+def _free_position(x, y, placed_by_layer, node_separation):
+    """The position closest to (x, y) in the same layer that is not taken yet, trying right then left."""
+    taken = placed_by_layer[y]
+    for offset in range(len(taken) + 1):
+        for candidate in (x + offset * node_separation, x - offset * node_separation):
+            if all(abs(candidate - other) >= node_separation for other in taken):
+                return candidate
+    return x
+
+
+def stable_layout(G, previous_pos_dict, compute_layout):
+    """Lay out G keeping the positions of the nodes it shares with the previous layout."""
+    matched = match_nodes(G, previous_pos_dict)
+    changed = [node for node in G.nodes if node not in matched]
+    if not matched or len(changed) > MAX_CHANGED_FRACTION * len(G):
+        return compute_layout(G)
+
+    pos_dict = {node: tuple(pos) for node, pos in matched.items()}
+    rank_separation, node_separation = _separations(G, pos_dict)
+    placed_by_layer = defaultdict(list)
+    for x, y in pos_dict.values():
+        placed_by_layer[y].append(x)
+
+    def place(node, x, y):
+        x = _free_position(x, y, placed_by_layer, node_separation)
+        placed_by_layer[y].append(x)
+        pos_dict[node] = (x, y)
+
+    try:
+        order = list(nx.topological_sort(G))
+        acyclic = True
+    except nx.NetworkXUnfeasible:
+        order = list(G.nodes)
+        acyclic = False
+    # Below placed parents in topological order, then above placed children in reverse order
+    for node in order:
+        parents = [pos_dict[parent] for parent in G.predecessors(node) if parent in pos_dict]
+        if node not in pos_dict and parents:
+            place(node, float(np.mean([x for x, _ in parents])), min(y for _, y in parents) - rank_separation)
+    for node in reversed(order):
+        children = [pos_dict[child] for child in G.successors(node) if child in pos_dict]
+        if node not in pos_dict and children:
+            place(node, float(np.mean([x for x, _ in children])), max(y for _, y in children) + rank_separation)
+    # Not connected to anything that was placed: to the right of the layout
+    right = max(x for x, _ in pos_dict.values()) + node_separation
+    top = max(y for _, y in pos_dict.values())
+    for node in order:
+        if node not in pos_dict:
+            place(node, right, top)
+    # E.g. a node inserted between two layers lands on the layer of its child, which then moves down,
+    # and so do its descendants in turn
+    if acyclic:
+        for node in order:
+            parents = [pos_dict[parent][1] for parent in G.predecessors(node)]
+            x, y = pos_dict[node]
+            if parents and y > min(parents) - rank_separation / 2:
+                placed_by_layer[y].remove(x)
+                place(node, x, min(parents) - rank_separation)
+    return pos_dict
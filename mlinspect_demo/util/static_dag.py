@@ -0,0 +1,301 @@
+"""
+Approximate DAG of a pipeline from static analysis of its source code.
+
+Before a pipeline is executed, its DAG is previewed by walking the top-level statements
+of its AST and recognizing the pandas and sklearn calls that mlinspect instruments:
+read_csv, merge, groupby/agg, selections, projections, train_test_split, Pipeline,
+ColumnTransformer, fit and score. Variables are tracked by name only, so the result
+is an approximation of the DAG mlinspect extracts, but it is available in milliseconds.
+"""
+import ast
+from collections import namedtuple
+from dataclasses import dataclass
+from enum import Enum
+
+import networkx as nx
+
+
+class StaticOperatorType(Enum):
+    """Operator types of the static DAG, named like the ones of mlinspect."""
+    DATA_SOURCE = ("Data Source", "DS")
+    SELECTION = ("Selection", "σ")
+    PROJECTION = ("Projection", "π")
+    PROJECTION_MODIFY = ("Projection (Modify)", "π'")
+    JOIN = ("Join", "⋈")
+    GROUP_BY_AGG = ("Groupby and Aggregate", "γ")
+    TRAIN_TEST_SPLIT = ("Train Test Split", "TTS")
+    TRANSFORMER = ("Transformer", "T")
+    CONCATENATION = ("Concatenation", "+")
+    TRAIN_DATA = ("Train Data", "X")
+    TRAIN_LABELS = ("Train Labels", "y")
+    TEST_DATA = ("Test Data", "X'")
+    TEST_LABELS = ("Test Labels", "y'")
+    ESTIMATOR = ("Estimator", "E")
+    SCORE = ("Score", "S")
+
+    def __new__(cls, value, short_value):
+        member = object.__new__(cls)
+        member._value_ = value
+        member.short_value = short_value
+        return member
+
+
+@dataclass(frozen=True)
+class StaticCodeReference:
+    lineno: int
+    col_offset: int
+    end_lineno: int
+    end_col_offset: int
+
+
+@dataclass(frozen=True)
+class StaticDagNode:
+    node_id: int
+    operator_type: StaticOperatorType
+    code_reference: StaticCodeReference
+    description: str = ""
+
+
+# Estimators and transformers that are not fitted yet: kind is "pipeline" (children: the steps),
+# "column_transformer" (children: (transformer, columns) tuples) or "transformer" (no children)
+_Estimator = namedtuple("_Estimator", ["kind", "name", "children", "expr"])
+# Fitted estimator, with the estimator node of the DAG
+_Fitted = namedtuple("_Fitted", ["estimator", "node"])
+
+_PANDAS_MODULES = {"pd", "pandas"}
+_MAX_DESCRIPTION_LENGTH = 40
+
+
+def _subscript_slice(expr):
+    # Python 3.8 wraps the slice in ast.Index
+    index_type = getattr(ast, "Index", ())
+    return expr.slice.value if isinstance(expr.slice, index_type) else expr.slice
+
+
+def _literal(expr):
+    try:
+        return ast.literal_eval(expr)
+    except (ValueError, TypeError, SyntaxError):
+        return None
+
+
+def _column_list(expr):
+    columns = _literal(expr) if expr is not None else None
+    if isinstance(columns, str):
+        return [columns]
+    if isinstance(columns, list) and all(isinstance(column, str) for column in columns):
+        return columns
+    return None
+
+
+def _keyword(call, name, position=None):
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    if position is not None and len(call.args) > position:
+        return call.args[position]
+    return None
+
+
+def _call_name(call):
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    return None
+
+
+class _StaticDagExtractor:
+    """Walks the top-level statements of a pipeline and builds its approximate DAG."""
+
+    def __init__(self, source):
+        self.source = source
+        self.dag = nx.DiGraph()
+        self.variables = {}
+
+    def extract(self):
+        for statement in ast.parse(self.source).body:
+            if isinstance(statement, ast.Assign):
+                self._assign(statement)
+            elif isinstance(statement, ast.Expr):
+                self._visit(statement.value)
+        return self.dag
+
+    def _add_node(self, operator_type, expr, description="", parents=()):
+        code_reference = StaticCodeReference(expr.lineno, expr.col_offset, expr.end_lineno, expr.end_col_offset)
+        if len(description) > _MAX_DESCRIPTION_LENGTH:
+            description = description[:_MAX_DESCRIPTION_LENGTH - 3] + "..."
+        node = StaticDagNode(len(self.dag), operator_type, code_reference, description)
+        self.dag.add_node(node)
+        for parent in parents:
+            if isinstance(parent, StaticDagNode):
+                self.dag.add_edge(parent, node)
+        return node
+
+    def _source(self, expr):
+        return " ".join((ast.get_source_segment(self.source, expr) or "").split())
+
+    def _assign(self, statement):
+        for target in statement.targets:
+            if isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name) \
+                    and isinstance(self.variables.get(target.value.id), StaticDagNode):
+                # e.g. data['label'] = ...
+                self._visit(statement.value)
+                columns = _column_list(_subscript_slice(target))
+                description = f"modifies {columns}" if columns else ""
+                self.variables[target.value.id] = self._add_node(
+                    StaticOperatorType.PROJECTION_MODIFY, statement, description, [self.variables[target.value.id]])
+                return
+
+        value = self._visit(statement.value)
+        for target in statement.targets:
+            if isinstance(target, ast.Name):
+                self.variables[target.id] = value
+            elif isinstance(target, ast.Tuple):
+                # e.g. train_data, test_data = train_test_split(data)
+                for element in target.elts:
+                    if isinstance(element, ast.Name):
+                        self.variables[element.id] = value
+
+    def _visit(self, expr):
+        """Return the DAG node, estimator or fitted estimator that the expression evaluates to, if any."""
+        if isinstance(expr, ast.Name):
+            return self.variables.get(expr.id)
+        if isinstance(expr, ast.Call):
+            return self._call(expr)
+        if isinstance(expr, ast.Subscript):
+            return self._subscript(expr)
+        for child in ast.iter_child_nodes(expr):
+            self._visit(child)
+        return None
+
+    def _subscript(self, expr):
+        frame = self._visit(expr.value)
+        if not isinstance(frame, StaticDagNode):
+            return None
+        selection = _subscript_slice(expr)
+        columns = _column_list(selection)
+        if columns is not None:
+            return self._add_node(StaticOperatorType.PROJECTION, expr, f"to {columns}", [frame])
+        return self._add_node(StaticOperatorType.SELECTION, expr, f"Select by {self._source(selection)}", [frame])
+
+    def _call(self, call):
+        name = _call_name(call)
+        receiver = call.func.value if isinstance(call.func, ast.Attribute) else None
+        receiver_is_pandas = isinstance(receiver, ast.Name) and receiver.id in _PANDAS_MODULES
+
+        if name == "read_csv":
+            path = _literal(call.args[0]) if call.args else None
+            return self._add_node(StaticOperatorType.DATA_SOURCE, call, path if isinstance(path, str) else "")
+        if name == "merge" and receiver is not None:
+            inputs = call.args[:2] if receiver_is_pandas else [receiver] + call.args[:1]
+            on = _keyword(call, "on")
+            description = f"on {self._source(on)}" if on is not None else ""
+            return self._add_node(StaticOperatorType.JOIN, call, description, [self._visit(arg) for arg in inputs])
+        if name in ("agg", "aggregate") and isinstance(receiver, ast.Call) and _call_name(receiver) == "groupby":
+            frame = self._visit(receiver.func.value)
+            by = _keyword(receiver, "by", 0)
+            description = f"Groupby {self._source(by)}" if by is not None else "Groupby"
+            return self._add_node(StaticOperatorType.GROUP_BY_AGG, call, description, [frame])
+        if name == "dropna" and receiver is not None:
+            return self._add_node(StaticOperatorType.SELECTION, call, "dropna", [self._visit(receiver)])
+        if name == "train_test_split":
+            return self._add_node(StaticOperatorType.TRAIN_TEST_SPLIT, call, "",
+                                  [self._visit(arg) for arg in call.args])
+        if name == "label_binarize":
+            classes = _keyword(call, "classes")
+            description = f"label_binarize, classes: {self._source(classes)}" if classes is not None else ""
+            return self._add_node(StaticOperatorType.PROJECTION_MODIFY, call, description,
+                                  [self._visit(arg) for arg in call.args[:1]])
+        if name == "Pipeline":
+            steps = _keyword(call, "steps", 0)
+            return _Estimator("pipeline", name, self._estimator_steps(steps), call)
+        if name == "ColumnTransformer":
+            transformers = _keyword(call, "transformers", 0)
+            return _Estimator("column_transformer", name, self._column_transformers(transformers), call)
+        if name in ("fit", "score") and receiver is not None:
+            estimator = self._visit(receiver)
+            if isinstance(estimator, (_Estimator, _Fitted)):
+                inputs = [self._visit(arg) for arg in call.args[:2]]
+                inputs += [None] * (2 - len(inputs))
+                if name == "score":
+                    return self._score(estimator, call, *inputs)
+                fitted = self._fit(estimator, call, *inputs)
+                if isinstance(receiver, ast.Name):
+                    self.variables[receiver.id] = fitted
+                return fitted
+        if name is not None and name[:1].isupper() and receiver is None:
+            # Constructor of some other estimator or transformer
+            for arg in call.args + [keyword.value for keyword in call.keywords]:
+                self._visit(arg)
+            return _Estimator("transformer", name, [], call)
+
+        for child in ast.iter_child_nodes(call):
+            self._visit(child)
+        if receiver is not None:
+            # e.g. data.copy(), data.reset_index()
+            value = self._visit(receiver)
+            if isinstance(value, StaticDagNode):
+                return value
+        return None
+
+    def _estimator_steps(self, steps):
+        if not isinstance(steps, ast.List):
+            return []
+        return [self._visit(step.elts[1]) for step in steps.elts
+                if isinstance(step, ast.Tuple) and len(step.elts) >= 2]
+
+    def _column_transformers(self, transformers):
+        if not isinstance(transformers, ast.List):
+            return []
+        children = []
+        for transformer in transformers.elts:
+            if isinstance(transformer, ast.Tuple) and len(transformer.elts) >= 3:
+                children.append((self._visit(transformer.elts[1]), _column_list(transformer.elts[2]) or []))
+        return children
+
+    def _transform(self, estimator, node):
+        """Add the transformer nodes that the data of node flows through, and return the last one."""
+        if not isinstance(estimator, _Estimator):
+            return node
+        if estimator.kind == "pipeline":
+            for step in estimator.children:
+                node = self._transform(step, node)
+            return node
+        if estimator.kind == "column_transformer":
+            outputs = []
+            for transformer, columns in estimator.children:
+                for column in columns:
+                    projection = self._add_node(StaticOperatorType.PROJECTION, estimator.expr,
+                                                f"to ['{column}'] (ColumnTransformer)", [node])
+                    outputs.append(self._transform(transformer, projection))
+            return self._add_node(StaticOperatorType.CONCATENATION, estimator.expr, "", outputs)
+        return self._add_node(StaticOperatorType.TRANSFORMER, estimator.expr, estimator.name, [node])
+
+    def _fit(self, estimator, call, data, labels):
+        if isinstance(estimator, _Fitted):
+            estimator = estimator.estimator
+        train_data = self._add_node(StaticOperatorType.TRAIN_DATA, call, "", [data])
+        train_labels = self._add_node(StaticOperatorType.TRAIN_LABELS, call, "", [labels])
+        if estimator.kind == "pipeline" and estimator.children:
+            features = self._transform(estimator._replace(children=estimator.children[:-1]), train_data)
+            final = estimator.children[-1]
+        else:
+            features, final = train_data, estimator
+        final_name = final.name if isinstance(final, _Estimator) else ""
+        final_expr = final.expr if isinstance(final, _Estimator) else call
+        node = self._add_node(StaticOperatorType.ESTIMATOR, final_expr, final_name, [features, train_labels])
+        return _Fitted(estimator, node)
+
+    def _score(self, fitted, call, data, labels):
+        test_data = self._add_node(StaticOperatorType.TEST_DATA, call, "", [data])
+        test_labels = self._add_node(StaticOperatorType.TEST_LABELS, call, "", [labels])
+        parents = [test_data, test_labels]
+        if isinstance(fitted, _Fitted):
+            parents.insert(0, fitted.node)
+        return self._add_node(StaticOperatorType.SCORE, call, "", parents)
+
+
+def extract_static_dag(pipeline):
+    """Return the approximate DAG of the pipeline source code. Raises SyntaxError or ValueError for invalid code."""
+    return _StaticDagExtractor(pipeline).extract()
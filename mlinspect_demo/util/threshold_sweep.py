@@ -0,0 +1,80 @@
+"""
+Evaluation of NoBiasIntroducedFor over a grid of thresholds.
+
+Instead of executing the pipeline once per threshold setting, the acceptance criteria of
+the check are evaluated for all settings at once, on the before_and_after_df frames of
+the distribution changes of a single execution.
+"""
+import numpy as np
+
+
+def threshold_grid(start, stop, num=21):
+    """Evenly spaced thresholds, given in percent, as decimals."""
+    return np.linspace(start, stop, num) / 100.
+
+
+def _distribution_change_statistics(distribution_changes):
+    """
+    Compute the minimum relative ratio change and the ratio between the highest and lowest
+    removal probability of each distribution change, vectorized over all frames at once.
+    """
+    frames = [change.before_and_after_df for change in distribution_changes]
+    lengths = np.array([len(frame) for frame in frames])
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    ratio_before = np.concatenate([frame["ratio_before"].to_numpy(dtype=float) for frame in frames])
+    ratio_after = np.concatenate([frame["ratio_after"].to_numpy(dtype=float) for frame in frames])
+    removal_probability = np.concatenate([frame["removal_probability"].to_numpy(dtype=float) for frame in frames])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_ratio_change = (ratio_after - ratio_before) / ratio_before
+    # Values that did not occur before the operator can not have become less frequent
+    relative_ratio_change[~np.isfinite(relative_ratio_change)] = np.inf
+    min_relative_ratio_change = np.minimum.reduceat(relative_ratio_change, offsets)
+
+    # fmin/fmax ignore the NaN removal probabilities of values that did not occur before
+    min_removal_probability = np.fmin.reduceat(removal_probability, offsets)
+    max_removal_probability = np.fmax.reduceat(removal_probability, offsets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probability_ratio = max_removal_probability / min_removal_probability
+    # Nothing removed at all, or no value occurred before
+    probability_ratio[~(max_removal_probability > 0)] = 1.
+
+    return min_relative_ratio_change, probability_ratio
+
+
+def sweep_no_bias_thresholds(check_result, ratio_thresholds, probability_thresholds):
+    """
+    Evaluate a NoBiasIntroducedFor check result for every combination of thresholds.
+
+    Returns the DAG nodes with distribution changes and a boolean array `failures` of shape
+    (nodes, ratio thresholds, probability thresholds), where failures[n, r, p] is True if
+    node n introduces bias for any sensitive column with min_allowed_relative_ratio_change
+    ratio_thresholds[r] and max_allowed_probability_difference probability_thresholds[p].
+    """
+    ratio_thresholds = np.asarray(ratio_thresholds, dtype=float)
+    probability_thresholds = np.asarray(probability_thresholds, dtype=float)
+
+    nodes = []
+    node_indices = []
+    distribution_changes = []
+    for node, column_to_distribution_change in check_result.bias_distribution_change.items():
+        for distribution_change in column_to_distribution_change.values():
+            if distribution_change.before_and_after_df.empty:
+                continue
+            if not nodes or nodes[-1] is not node:
+                nodes.append(node)
+            node_indices.append(len(nodes) - 1)
+            distribution_changes.append(distribution_change)
+
+    failures = np.zeros((len(nodes), len(ratio_thresholds), len(probability_thresholds)), dtype=bool)
+    if not distribution_changes:
+        return nodes, failures
+
+    min_relative_ratio_change, probability_ratio = _distribution_change_statistics(distribution_changes)
+    change_failures = (min_relative_ratio_change[:, None, None] < ratio_thresholds[None, :, None]) \
+        | (probability_ratio[:, None, None] > probability_thresholds[None, None, :])
+
+    # A node fails if the distribution of any of the sensitive columns changes too much
+    np.logical_or.at(failures, np.array(node_indices), change_failures)
+    return nodes, failures
@@ -19,7 +19,7 @@ setup(
         "example_pipelines": ["healthcare", "adult"],
     },
     install_requires=[
-        "dash<2",
+        "dash>=1.12,<2",
         "dash-bootstrap-components<1",
         "dataclasses-serialization",
         "mlinspect[dev] @ git+https://github.com/stefan-grafberger/mlinspect.git@demo",
@@ -0,0 +1,19 @@
+"""
+DAG nodes shaped like the ones of mlinspect, shared by the tests.
+"""
+from collections import namedtuple
+from enum import Enum
+
+
+class OperatorType(Enum):
+    DATA_SOURCE = "Data Source"
+    SELECTION = "Selection"
+    PROJECTION = "Projection"
+
+
+CodeReference = namedtuple("CodeReference", ["lineno", "col_offset", "end_lineno", "end_col_offset"])
+DagNode = namedtuple("DagNode", ["node_id", "operator_type", "code_reference", "description"])
+
+
+def dag_node(lineno, operator_type=OperatorType.DATA_SOURCE, node_id=0, description=""):
+    return DagNode(node_id, operator_type, CodeReference(lineno, 0, lineno, 10), description)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from mlinspect_demo.util.approximate_histogram import ColumnSketch, CountMinSketch, MisraGries
+
+
+def test_count_min_sketch_overestimates_by_at_most_epsilon_total():
+    rng = np.random.default_rng(0)
+    values = rng.zipf(1.5, size=20000) % 1000
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    counts = dict(zip(*np.unique(values, return_counts=True)))
+    sketch.update({int(value): int(count) for value, count in counts.items()})
+    estimates = sketch.estimate([int(value) for value in counts])
+    exact = np.array(list(counts.values()))
+    assert (estimates >= exact).all()
+    assert ((estimates - exact) <= 0.01 * len(values)).mean() >= 0.99
+
+
+def test_misra_gries_keeps_frequent_values():
+    summary = MisraGries(size=2)
+    summary.update({"a": 50, "b": 30})
+    summary.update({"c": 5, "d": 5, "e": 5})
+    assert set(summary.values()) >= {"a", "b"}
+    assert len(summary.values()) <= 2
+
+
+def test_column_sketch_histogram():
+    sketch = ColumnSketch(epsilon=0.01)
+    for value in ["a"] * 100 + ["b"] * 50 + [float("nan")] * 10:
+        sketch.add(value)
+    histogram = sketch.histogram()
+    assert histogram["a"] >= 100 and histogram["b"] >= 50
+    # Missing values are counted as one value
+    assert sum(1 for value in histogram if value != value) == 1
@@ -0,0 +1,67 @@
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mlinspect_demo.util.csv_cache import CsvCache, cached_read_csv
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "data.csv"
+    pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", None], "c": [0.5, np.nan, 1.5]}).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CsvCache(directory=str(tmp_path / "cache"), max_bytes=2**20)
+
+
+def test_cache_is_disabled_by_default(tmp_path, csv_path):
+    cache = CsvCache(directory=str(tmp_path / "cache"))
+    key = cache.key((csv_path,), {})
+    cache.store(key, pd.read_csv(csv_path))
+    assert cache.load(key) is None
+
+
+def test_cached_frames_equal_parsed_frames(cache, csv_path):
+    with cached_read_csv(cache):
+        first = pd.read_csv(csv_path)
+        assert len(os.listdir(cache.directory)) == 1
+        second = pd.read_csv(csv_path)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_keys_depend_on_arguments_and_file(cache, csv_path):
+    key = cache.key((csv_path,), {})
+    assert key == cache.key((), {"filepath_or_buffer": csv_path})
+    assert key != cache.key((csv_path,), {"usecols": ["a"]})
+    assert cache.key((csv_path,), {"chunksize": 1}) is None
+    with open(csv_path, "a") as file:
+        file.write("4,z,2.5\n")
+    assert key != cache.key((csv_path,), {})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, csv_path):
+    frame = pd.DataFrame({"a": np.zeros(10000)})
+    cache = CsvCache(directory=str(tmp_path / "cache"), max_bytes=int(frame.memory_usage().sum() * 1.5))
+    cache.store("first", frame)
+    cache.store("second", frame)
+    assert cache.load("first") is None
+    assert cache.load("second") is not None
+
+
+def test_directories_writable_by_others_are_not_used(cache, csv_path):
+    os.makedirs(cache.directory)
+    os.chmod(cache.directory, 0o777)
+    cache.store("key", pd.read_csv(csv_path))
+    assert not os.listdir(cache.directory)
+
+
+def test_read_csv_keeps_the_module_of_pandas(cache):
+    # mlinspect only instruments functions of pandas
+    with cached_read_csv(cache):
+        assert inspect.getmodule(pd.read_csv).__name__.startswith("pandas")
@@ -0,0 +1,28 @@
+from mlinspect_demo.util.histograms import summarize_distribution
+
+
+def test_small_distributions_are_not_summarized():
+    assert summarize_distribution({"a": 1, "b": 2}) == (["a", "b"], [1, 2], False)
+
+
+def test_numeric_values_are_binned_by_quantiles():
+    labels, counts, summarized = summarize_distribution({value: 1 for value in range(100)}, max_bars=4)
+    assert summarized
+    assert len(labels) == 4 and labels[0].startswith("[0, ") and labels[-1].endswith(", 99]")
+    assert sum(counts) == 100 and all(abs(count - 25) <= 1 for count in counts)
+
+
+def test_missing_values_keep_their_own_bars():
+    distribution = {value: 1 for value in range(100)}
+    distribution.update({float("nan"): 5, None: 3})
+    labels, counts, _ = summarize_distribution(distribution, max_bars=4)
+    assert labels[-2:] == ["None", "nan"] and counts[-2:] == [3, 5]
+    assert sum(counts) == 108
+
+
+def test_other_values_are_reduced_to_the_most_frequent_ones():
+    distribution = {f"value {i}": i for i in range(1, 31)}
+    labels, counts, summarized = summarize_distribution(distribution, max_bars=3)
+    assert summarized
+    assert labels == ["value 30", "value 29", "other (28 values)"]
+    assert counts == [30, 29, sum(range(1, 29))]
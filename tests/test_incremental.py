@@ -0,0 +1,159 @@
+import ast
+import json
+import os
+import signal
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from mlinspect_demo.util import incremental
+from mlinspect_demo.util.incremental import Checkpoint, CheckpointPool, _statement_digests
+
+
+@pytest.fixture
+def released(monkeypatch):
+    released = []
+    monkeypatch.setattr(incremental, "release_checkpoints", released.extend)
+    return released
+
+
+def _checkpoints(name, count):
+    return [Checkpoint(index, f"{name}{index}", f"/tmp/{name}{index}.sock") for index in range(1, count + 1)]
+
+
+def test_statement_digests_identify_prefixes():
+    first = ast.parse("a = 1\nb = 2\nc = 3").body
+    second = ast.parse("a = 1\nb = 2\nc = 4").body
+    first_digests, second_digests = _statement_digests(first, "seed"), _statement_digests(second, "seed")
+    assert first_digests[:2] == second_digests[:2] and first_digests[2] != second_digests[2]
+    assert _statement_digests(first, "other seed")[0] != first_digests[0]
+
+
+def test_statement_digests_include_positions():
+    assert _statement_digests(ast.parse("a = 1").body, "") != _statement_digests(ast.parse("\na = 1").body, "")
+
+
+def test_pool_releases_replaced_checkpoints(released):
+    pool = CheckpointPool(max_checkpoints=10)
+    first, second = _checkpoints("a", 3), _checkpoints("b", 2)
+    assert pool.update("session", first) == first
+    assert pool.update("session", first[:1] + second) == first[:1] + second
+    assert released == first[1:]
+
+
+def test_pool_is_bounded_for_all_sessions(released):
+    pool = CheckpointPool(max_checkpoints=4)
+    pool.update("old", _checkpoints("a", 3))
+    pool.update("new", _checkpoints("b", 2))
+    assert released == _checkpoints("a", 3) and len(pool) == 2
+
+
+def test_pool_keeps_last_checkpoints_of_an_execution(released):
+    pool = CheckpointPool(max_checkpoints=2)
+    assert pool.update("session", _checkpoints("a", 3)) == _checkpoints("a", 3)[1:]
+    assert released == _checkpoints("a", 1)
+
+
+def test_pool_releases_checkpoints_of_discarded_sessions(released):
+    pool = CheckpointPool(max_checkpoints=10)
+    pool.update("session", _checkpoints("a", 2))
+    pool.discard("session")
+    assert released == _checkpoints("a", 2) and len(pool) == 0
+
+
+@pytest.fixture
+def shared_directory(monkeypatch, tmp_path):
+    tmp_path.chmod(0o777)
+    monkeypatch.setattr(incremental, "CHECKPOINT_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(incremental, "_job_state", incremental._JobState("", _checkpoints("a", 1)))
+    return tmp_path
+
+
+def test_no_checkpoints_are_created_in_a_directory_of_other_users(monkeypatch, shared_directory):
+    monkeypatch.setattr(incremental, "_thread_count", lambda: 1)
+    monkeypatch.setattr(os, "fork", lambda: pytest.fail("Forked a checkpoint"))
+    incremental._create_checkpoint(SimpleNamespace(index=1, digests=["b1"], since_checkpoint=0.))
+    assert incremental._job_state.created == [] and os.listdir(shared_directory) == []
+
+
+def test_checkpoints_in_a_directory_of_other_users_are_not_resumed(monkeypatch, shared_directory):
+    monkeypatch.setattr(incremental, "_connect", lambda address: pytest.fail("Connected to a checkpoint"))
+    code = SimpleNamespace(statements=[], digests=["a1"])
+    incremental._resume_from_checkpoint(code)
+
+
+class _FailingConnection:
+    """Connection to a checkpoint whose resumed execution exits right away."""
+
+    def send(self, request):
+        pass
+
+    def recv(self):
+        if not hasattr(self, "pid"):
+            self.pid = 0
+            return self.pid
+        raise EOFError
+
+    def close(self):
+        pass
+
+
+def test_failed_checkpoints_are_discarded(monkeypatch, released):
+    checkpoints = _checkpoints("a", 2)
+    monkeypatch.setattr(incremental, "_job_state", incremental._JobState("", checkpoints))
+    monkeypatch.setattr(incremental, "is_private_directory", lambda path: True)
+    monkeypatch.setattr(incremental, "_connect", lambda address: _FailingConnection())
+    handler = signal.getsignal(signal.SIGTERM)
+    with pytest.warns(RuntimeWarning):
+        # Returns to execute the statements in this process
+        incremental._resume_from_checkpoint(SimpleNamespace(statements=[], digests=["a1", "a2"]))
+    assert released == checkpoints[::-1] and incremental._job_state.available == []
+    assert signal.getsignal(signal.SIGTERM) == handler
+
+
+# Executes a pipeline and then its edited version in worker processes, and prints the line numbers
+# of the DAG nodes of the second execution
+_EXECUTE_EDITED_PIPELINE = """
+import json, sys, time
+from mlinspect_demo.util.incremental import execute_incrementally, release_checkpoints
+from mlinspect_demo.util.jobs import JobManager, create_context
+
+def execute(manager, pipeline, checkpoints):
+    job_id = manager.submit(execute_incrementally, pipeline, {}, {}, checkpoints)
+    while not manager.get(job_id).finished:
+        time.sleep(0.05)
+    assert manager.get(job_id).error is None, manager.get(job_id).error
+    return manager.get(job_id).result
+
+manager = JobManager(context=create_context("forkserver"))
+pipeline, edited_pipeline = json.loads(sys.argv[1])
+_, _, checkpoints = execute(manager, pipeline, [])
+inspector_result, _, resumed_checkpoints = execute(manager, edited_pipeline, checkpoints)
+release_checkpoints(checkpoints + resumed_checkpoints)
+manager.shutdown()
+print(json.dumps(sorted(node.code_reference.lineno for node in inspector_result.dag.nodes)))
+"""
+
+
+def test_dag_of_a_resumed_execution_is_extracted_from_the_new_pipeline(tmp_path):
+    pytest.importorskip("mlinspect")
+    marker, path = tmp_path / "prefix.txt", tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n3,\n")
+    pipeline = "\n".join([
+        "import pandas as pd",
+        f"open({str(marker)!r}, 'a').write('executed')",
+        f"data = pd.read_csv({str(path)!r})",
+        "data = data.dropna()",
+    ])
+    edited_pipeline = pipeline + "\ndata = data[['a']]"
+    environment = dict(os.environ, MLINSPECT_DEMO_INCREMENTAL="1", MLINSPECT_DEMO_CHECKPOINT_SECONDS="0",
+                       TMPDIR=str(tmp_path))
+    process = subprocess.run([sys.executable, "-c", _EXECUTE_EDITED_PIPELINE,
+                              json.dumps([pipeline, edited_pipeline])],
+                             cwd=os.path.dirname(os.path.dirname(__file__)), env=environment,
+                             capture_output=True, text=True, timeout=300, check=True)
+    # The prefix was only executed once, and the new projection is in the DAG
+    assert marker.read_text() == "executed"
+    assert 5 in json.loads(process.stdout.splitlines()[-1])
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from mlinspect_demo.util.jobs import CANCELLED, DONE, FAILED, TIMED_OUT, JobManager, JobQueueFull
+
+
+def _add(a, b):
+    return a + b
+
+
+def _fail():
+    raise ValueError("pipeline failed")
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+
+
+def _unpicklable():
+    return threading.Lock()
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1, max_pending=2, timeout=5)
+    yield manager
+    manager.shutdown()
+
+
+def _wait(manager, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_job_result(manager):
+    job = _wait(manager, manager.submit(_add, 1, 2))
+    assert job.status == DONE and job.result == 3
+
+
+def test_job_failure_reports_traceback(manager):
+    job = _wait(manager, manager.submit(_fail))
+    assert job.status == FAILED and "ValueError: pipeline failed" in job.error
+
+
+def test_unpicklable_result_reports_traceback(manager):
+    job = _wait(manager, manager.submit(_unpicklable))
+    assert job.status == FAILED and "Traceback" in job.error
+
+
+def test_cancel_running_job(manager):
+    job_id = manager.submit(_sleep, 10)
+    assert manager.cancel(job_id)
+    assert manager.get(job_id).status == CANCELLED
+
+
+def test_timeout():
+    manager = JobManager(max_workers=1, timeout=0.5)
+    try:
+        job = _wait(manager, manager.submit(_sleep, 10))
+        assert job.status == TIMED_OUT
+    finally:
+        manager.shutdown()
+
+
+def test_queue_is_bounded(manager):
+    manager.submit(_sleep, 10)
+    # The first job may not have been started yet
+    with pytest.raises(JobQueueFull):
+        for _ in range(3):
+            manager.submit(_sleep, 10)
+
+
+def test_forget_returns_finished_job_once(manager):
+    job_id = manager.submit(_add, 1, 2)
+    _wait(manager, job_id)
+    assert manager.forget(job_id) is not None
+    assert manager.forget(job_id) is None and manager.get(job_id) is None
@@ -0,0 +1,58 @@
+import networkx as nx
+
+from mlinspect_demo.util.large_dag import CollapsedOperatorType, SuperNode, annotation_max_range, \
+    collapse_subgraphs, composite_estimator_spans
+from mlinspect_demo.util.static_dag import StaticCodeReference, StaticDagNode, StaticOperatorType
+
+
+PIPELINE = """
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+pipeline = Pipeline([
+    ("encode", OneHotEncoder()),
+    ("scale", StandardScaler()),
+])
+"""
+
+
+def node(node_id, lineno, operator_type=StaticOperatorType.TRANSFORMER):
+    return StaticDagNode(node_id, operator_type, StaticCodeReference(lineno, 4, lineno, 30))
+
+
+def dag():
+    source, encode, scale, estimator = node(0, 1, StaticOperatorType.DATA_SOURCE), node(1, 6), node(2, 7), \
+        node(3, 10, StaticOperatorType.ESTIMATOR)
+    return nx.DiGraph([(source, encode), (encode, scale), (scale, estimator)]), source, encode, scale, estimator
+
+
+def test_composite_estimator_spans():
+    assert composite_estimator_spans(PIPELINE) == [
+        (CollapsedOperatorType.PIPELINE, StaticCodeReference(5, 11, 8, 2)),
+    ]
+    assert composite_estimator_spans("a = (") == []
+
+
+def test_operators_of_an_estimator_are_collapsed():
+    G, source, encode, scale, estimator = dag()
+    H, representatives = collapse_subgraphs(G, composite_estimator_spans(PIPELINE))
+    super_node = representatives[encode]
+    assert isinstance(super_node, SuperNode) and representatives[scale] is super_node
+    assert set(H.edges) == {(source, super_node), (super_node, estimator)}
+
+
+def test_expanded_estimators_are_not_collapsed():
+    G, *_ = dag()
+    spans = composite_estimator_spans(PIPELINE)
+    H, representatives = collapse_subgraphs(G, spans, expanded=tuple(span for _, span in spans))
+    assert not representatives and set(H.edges) == set(G.edges)
+
+
+def test_annotation_max_range():
+    assert annotation_max_range({}) == 0.
+    # Few nodes are annotated at any zoom
+    assert annotation_max_range({"a": (0., 0.), "b": (100., 50.)}) == 100.
+    # A single column is as wide as it is high
+    assert annotation_max_range({"a": (0., 0.), "b": (0., 50.)}) == 50.
+    many = {i: (float(i), 0.) for i in range(401)}
+    assert annotation_max_range(many) < 400.
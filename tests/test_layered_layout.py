@@ -0,0 +1,32 @@
+import networkx as nx
+
+from mlinspect_demo.util.layered_layout import NODE_SEPARATION, count_crossings, layered_layout
+
+
+def test_edges_point_down_one_or_more_layers():
+    G = nx.DiGraph([("a", "b"), ("b", "c"), ("a", "c"), ("d", "c")])
+    pos_dict = layered_layout(G)
+    for parent, child in G.edges:
+        assert pos_dict[parent][1] > pos_dict[child][1]
+
+
+def test_nodes_of_a_layer_keep_their_distance():
+    G = nx.DiGraph([("a", child) for child in "bcdef"])
+    pos_dict = layered_layout(G)
+    xs = sorted(pos_dict[child][0] for child in "bcdef")
+    assert all(right - left >= NODE_SEPARATION - 1e-9 for left, right in zip(xs, xs[1:]))
+
+
+def test_crossings_are_removed():
+    # Drawn in insertion order, the edges a-d and b-c cross
+    G = nx.DiGraph()
+    G.add_nodes_from("abcd")
+    G.add_edges_from([("a", "d"), ("b", "c")])
+    assert count_crossings(G, {"a": (0, 1), "b": (1, 1), "c": (0, 0), "d": (1, 0)}) == 1
+    assert count_crossings(G, layered_layout(G)) == 0
+
+
+def test_cycles_and_empty_graphs():
+    assert layered_layout(nx.DiGraph()) == {}
+    pos_dict = layered_layout(nx.DiGraph([("a", "b"), ("b", "a")]))
+    assert set(pos_dict) == {"a", "b"}
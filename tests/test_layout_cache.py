@@ -0,0 +1,47 @@
+import os
+
+import networkx as nx
+
+from conftest import OperatorType, dag_node
+from mlinspect_demo.util.layout_cache import LayoutCache, structural_hash
+
+
+def chain(length, offset=0):
+    nodes = [dag_node(i, OperatorType.SELECTION if i else OperatorType.DATA_SOURCE, offset + i, f"node {i}")
+             for i in range(length)]
+    return nx.DiGraph(list(zip(nodes, nodes[1:])))
+
+
+def positions(G):
+    return {node: (float(node.code_reference.lineno), 0.) for node in G}
+
+
+def test_structural_hash_does_not_depend_on_node_ids():
+    assert structural_hash(chain(3)) == structural_hash(chain(3, offset=10))
+    assert structural_hash(chain(3)) != structural_hash(chain(4))
+
+
+def test_identical_dags_are_laid_out_once():
+    cache = LayoutCache()
+    calls = []
+    cache.layout(chain(3), lambda G: calls.append(G) or positions(G))
+    pos_dict = cache.layout(chain(3, offset=10), lambda G: calls.append(G) or positions(G))
+    assert len(calls) == 1
+    assert sorted(pos_dict.values()) == [(0., 0.), (1., 0.), (2., 0.)]
+
+
+def test_evicted_layouts_stay_persisted(tmp_path):
+    cache = LayoutCache(max_entries=1, directory=str(tmp_path))
+    cache.layout(chain(2), positions)
+    cache.layout(chain(3), positions)
+    assert len(os.listdir(tmp_path)) == 2
+    calls = []
+    cache.layout(chain(2), lambda G: calls.append(G) or positions(G))
+    assert not calls
+
+
+def test_persisted_layouts_are_bounded(tmp_path):
+    cache = LayoutCache(directory=str(tmp_path), max_files=2)
+    for length in range(2, 6):
+        cache.layout(chain(length), positions)
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,50 @@
+import pytest
+
+from mlinspect_demo.util import jobs, progress
+from mlinspect_demo.util.progress import OPERATOR, OUTPUT, StreamingOutput
+
+
+@pytest.fixture
+def events(monkeypatch):
+    events = []
+    monkeypatch.setattr(jobs, "send_event", lambda kind, payload: events.append((kind, payload)))
+    monkeypatch.setattr(progress, "_OUTPUT_INTERVAL", 0.)
+    return events
+
+
+def test_streaming_output_sends_new_lines_once(events):
+    output = StreamingOutput()
+    output.write("a")
+    assert events == []
+    output.write("b\n")
+    output.write("c\n")
+    output.flush()
+    assert events == [(OUTPUT, "ab\n"), (OUTPUT, "c\n")]
+    assert output.getvalue() == "ab\nc\n"
+
+
+def test_streaming_output_replays_everything(events):
+    output = StreamingOutput()
+    output.write("a\n")
+    output.replay()
+    assert events == [(OUTPUT, "a\n"), (OUTPUT, "a\n")]
+
+
+def test_operators_are_reported_while_the_pipeline_is_executed(events, tmp_path):
+    pytest.importorskip("mlinspect")
+    from mlinspect_demo.util import execute_inspector_builder
+
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n3,\n")
+    pipeline = "\n".join([
+        "import pandas as pd",
+        f"data = pd.read_csv({str(path)!r})",
+        "data = data.dropna()",
+        "print('done')",
+    ])
+    execute_inspector_builder(pipeline, {}, {})
+    operators = [payload["lineno"] for kind, payload in events if kind == OPERATOR]
+    assert operators == [2, 3]
+    # Not only once the DAG is extracted after the execution
+    last_operator = max(index for index, (kind, _) in enumerate(events) if kind == OPERATOR)
+    assert last_operator < events.index((OUTPUT, "done\n"))
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from mlinspect_demo.util.result_cache import ResultCache, estimate_size, execution_cache_key, expanded_cache_key, \
+    normalize_pipeline
+
+
+def test_normalize_pipeline_strips_trailing_whitespace_and_line_endings():
+    assert normalize_pipeline("a = 1  \r\n\r\n  b = 2\t\n\n") == "a = 1\n\n  b = 2"
+
+
+def test_execution_cache_key_depends_on_normalized_pipeline_and_configuration():
+    checks = {"NoBiasIntroducedFor": (True, [["race"], -0.3, 2.0])}
+    inspections = {"RowLineage": (True, [5])}
+    key = execution_cache_key("a = 1\n", checks, inspections)
+    assert key == execution_cache_key("a = 1  \r\n", checks, inspections)
+    assert key != execution_cache_key("a = 2\n", checks, inspections)
+    assert key != execution_cache_key("a = 1\n", checks, {"RowLineage": (True, [10])})
+    assert key != execution_cache_key("a = 1\n", checks, inspections, preview=["race"])
+
+
+def test_estimate_size_counts_frames_and_arrays():
+    array = np.zeros(1000)
+    frame = pd.DataFrame({"a": np.zeros(1000)})
+    assert estimate_size(array) >= array.nbytes
+    assert estimate_size({"frame": frame, "array": array}) >= frame.memory_usage().sum() + array.nbytes
+
+
+def test_estimate_size_counts_shared_objects_once():
+    array = np.zeros(1000)
+    assert estimate_size([array, array]) < 2 * array.nbytes
+
+
+def test_estimate_size_visits_at_most_max_objects():
+    nested = [[str(i)] for i in range(1000)]
+    assert estimate_size(nested, max_objects=10) < estimate_size(nested)
+
+
+def test_result_cache_evicts_least_recently_used_entries():
+    cache = ResultCache(max_entries=2, max_bytes=100)
+    cache.put("a", 1, size=10)
+    cache.put("b", 2, size=10)
+    assert cache.get("a") == 1
+    cache.put("c", 3, size=10)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_result_cache_is_bounded_by_size():
+    cache = ResultCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, size=60)
+    cache.put("b", 2, size=60)
+    assert "a" not in cache and cache.total_bytes == 60
+    # Larger than the whole cache
+    cache.put("c", 3, size=200)
+    assert "c" not in cache and cache.get("b") == 2
+
+
+def test_result_cache_replaces_entries():
+    cache = ResultCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, size=60)
+    cache.put("a", 2, size=30)
+    assert cache.get("a") == 2 and cache.total_bytes == 30 and len(cache) == 1
+
+
+def test_expanded_cache_key_depends_on_execution_and_spans():
+    key = expanded_cache_key("execution", [(1, 0, 5, 1)])
+    assert key == expanded_cache_key("execution", ((1, 0, 5, 1),))
+    assert key != expanded_cache_key("other", [(1, 0, 5, 1)])
+    assert key != expanded_cache_key("execution", [(2, 0, 5, 1)])
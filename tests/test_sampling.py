@@ -0,0 +1,52 @@
+import inspect
+
+import pandas as pd
+
+from mlinspect_demo.util.sampling import sample_settings, sampled_read_csv, stratified_sample
+
+
+def frame():
+    return pd.DataFrame({"race": ["a"] * 900 + ["b"] * 90 + ["c"] * 10, "value": range(1000)})
+
+
+def test_small_frames_are_not_sampled():
+    full = frame()
+    assert stratified_sample(full, ["race"], 1000) is full
+
+
+def test_sample_keeps_the_share_of_each_stratum():
+    sample = stratified_sample(frame(), ["race"], 100)
+    assert sample["race"].value_counts().to_dict() == {"a": 90, "b": 9, "c": 1}
+    assert sample["value"].is_monotonic_increasing
+    assert list(sample.index) == list(range(len(sample)))
+
+
+def test_every_stratum_keeps_a_row():
+    sample = stratified_sample(frame(), ["race"], 10)
+    assert set(sample["race"]) == {"a", "b", "c"}
+
+
+def test_samples_are_reproducible():
+    assert stratified_sample(frame(), [], 50).equals(stratified_sample(frame(), [], 50))
+
+
+def test_only_frames_with_sensitive_columns_are_sampled(tmp_path):
+    with_race, without_race = tmp_path / "with.csv", tmp_path / "without.csv"
+    frame().to_csv(with_race, index=False)
+    frame().drop(columns="race").to_csv(without_race, index=False)
+    with sampled_read_csv(["race"], 100):
+        assert len(pd.read_csv(with_race)) == 100
+        assert len(pd.read_csv(without_race)) == 1000
+    assert len(pd.read_csv(with_race)) == 1000
+
+
+def test_read_csv_keeps_the_module_of_pandas():
+    # mlinspect only instruments functions of pandas
+    with sampled_read_csv(["race"], 100):
+        assert inspect.getmodule(pd.read_csv).__name__.startswith("pandas")
+
+
+def test_previews_on_other_columns_or_rows_have_other_samples():
+    assert sample_settings(["sex", "race"], 100) == sample_settings(["race", "sex"], 100)
+    assert sample_settings(["race"], 100) != sample_settings(["sex"], 100)
+    assert sample_settings(["race"], 100) != sample_settings(["race"], 200)
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from example_pipelines.schema import LazySchema
+
+
+def test_columns_are_read_once_from_the_header():
+    reads = []
+
+    def read_frame(nrows):
+        reads.append(nrows)
+        return pd.DataFrame({"a": [1], "b": [2]}).head(nrows)
+
+    schema = LazySchema(read_frame)
+    assert not reads
+    assert list(schema.columns) == ["a", "b"]
+    assert list(schema.columns) == ["a", "b"]
+    assert reads == [0]
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from mlinspect_demo.util import session_store
+from mlinspect_demo.util.session_store import SessionStore
+
+
+def test_get_creates_empty_session():
+    store = SessionStore()
+    session = store.get("a")
+    assert session.session_id == "a" and session.execution_key is None
+    assert store.get("a") is session
+
+
+def test_update_sets_fields():
+    store = SessionStore()
+    store.update("a", execution_key="key", job_id="job")
+    assert store.get("a").execution_key == "key" and store.get("a").job_id == "job"
+
+
+def test_sessions_expire():
+    store = SessionStore(ttl=0.05)
+    store.update("a", execution_key="key")
+    time.sleep(0.1)
+    assert store.get("a").execution_key is None
+
+
+def test_least_recently_used_sessions_are_evicted_over_budget():
+    store = SessionStore(max_bytes=30000)
+    store.update("a", static_pipeline="a" * 20000)
+    store.update("b", static_pipeline="b" * 20000)
+    assert len(store) == 1
+    assert store.get("b").static_pipeline == "b" * 20000
+    assert store.get("a").static_pipeline is None
+
+
+def test_size_is_only_estimated_when_sized_fields_change(monkeypatch):
+    store = SessionStore()
+    store.get("a")
+    calls = []
+    monkeypatch.setattr(session_store, "estimate_size", lambda obj: calls.append(obj) or 0)
+    store.update("a", job_id="job", execution_key="key")
+    assert not calls
+    store.update("a", static_pipeline="a = 1")
+    assert len(calls) == 1
+
+
+def test_sessions_are_persisted_without_jobs(tmp_path):
+    store = SessionStore(directory=str(tmp_path))
+    store.update("a", execution_key="key", job_id="job")
+    # Releases the lock of the directory, like a server process that exits
+    del store
+    restarted = SessionStore(directory=str(tmp_path))
+    session = restarted.get("a")
+    assert session.execution_key == "key" and session.job_id is None
+
+
+def test_job_updates_are_not_persisted(tmp_path, monkeypatch):
+    store = SessionStore(directory=str(tmp_path))
+    store.update("a", execution_key="key")
+    persisted = []
+    monkeypatch.setattr(store, "_persist", lambda session: persisted.append(session) or 0.)
+    store.update("a", job_id="job")
+    assert not persisted
+    store.update("a", execution_key="other")
+    assert len(persisted) == 1
+
+
+def test_session_ids_are_not_used_as_paths(tmp_path):
+    store = SessionStore(directory=str(tmp_path / "sessions"))
+    store.update("../../a", execution_key="key")
+    assert not (tmp_path / "a.pickle").exists()
+    assert store.get("../../a").execution_key == "key"
+
+
+def test_session_directory_is_used_by_one_server_process(tmp_path):
+    store = SessionStore(directory=str(tmp_path))
+    store.get("a")
+    other = SessionStore(directory=str(tmp_path))
+    with pytest.raises(RuntimeError):
+        other.get("a")
+
+
+def test_expired_and_evicted_sessions_are_discarded():
+    discarded = []
+    store = SessionStore(ttl=0.05, max_bytes=30000, on_discard=discarded.append)
+    store.update("a", static_pipeline="a" * 20000)
+    store.update("b", static_pipeline="b" * 20000)
+    assert discarded == ["a"]
+    time.sleep(0.1)
+    store.get("c")
+    assert discarded == ["a", "b"]
@@ -0,0 +1,52 @@
+import networkx as nx
+
+from conftest import OperatorType, dag_node
+from mlinspect_demo.util.stable_layout import match_nodes, stable_layout
+
+
+def not_called(G):
+    raise AssertionError("The whole DAG was laid out again")
+
+
+def assert_edges_point_down(G, pos_dict):
+    for parent, child in G.edges:
+        assert pos_dict[parent][1] > pos_dict[child][1]
+
+
+def test_nodes_on_shifted_lines_are_matched():
+    source, selection = dag_node(1, OperatorType.DATA_SOURCE), dag_node(2, OperatorType.SELECTION)
+    previous_pos_dict = {source: (0., 100.), selection: (0., 0.)}
+    shifted = [dag_node(3, OperatorType.DATA_SOURCE), dag_node(4, OperatorType.SELECTION)]
+    G = nx.DiGraph([tuple(shifted)])
+    assert match_nodes(G, previous_pos_dict) == {shifted[0]: (0., 100.), shifted[1]: (0., 0.)}
+
+
+def test_inserted_node_moves_its_descendants_down():
+    nodes = [dag_node(1, OperatorType.DATA_SOURCE), dag_node(3, OperatorType.SELECTION),
+             dag_node(4, OperatorType.SELECTION), dag_node(5, OperatorType.SELECTION)]
+    previous_pos_dict = {nodes[0]: (0., 200.), nodes[1]: (0., 100.), nodes[2]: (0., 0.), nodes[3]: (100., 0.)}
+    inserted = dag_node(2, OperatorType.PROJECTION)
+    G = nx.DiGraph([(nodes[0], inserted), (inserted, nodes[1]), (nodes[1], nodes[2]), (nodes[0], nodes[3])])
+    pos_dict = stable_layout(G, previous_pos_dict, not_called)
+    assert_edges_point_down(G, pos_dict)
+    assert pos_dict[nodes[0]] == (0., 200.) and pos_dict[nodes[3]] == (100., 0.)
+    assert pos_dict[inserted][1] == 100. and pos_dict[nodes[1]][1] == 0. and pos_dict[nodes[2]][1] == -100.
+    assert len(set(pos_dict.values())) == len(pos_dict)
+
+
+def test_new_components_are_layered():
+    source, selection = dag_node(1, OperatorType.DATA_SOURCE), dag_node(2, OperatorType.SELECTION)
+    previous_pos_dict = {source: (0., 100.), selection: (0., 0.)}
+    new_source, new_selection = dag_node(10, OperatorType.DATA_SOURCE), dag_node(11, OperatorType.SELECTION)
+    G = nx.DiGraph([(source, selection), (new_source, new_selection)])
+    # Half of the nodes changed
+    pos_dict = stable_layout(G, previous_pos_dict, not_called)
+    assert_edges_point_down(G, pos_dict)
+
+
+def test_too_many_changes_lay_out_the_whole_dag():
+    source = dag_node(1, OperatorType.DATA_SOURCE)
+    G = nx.DiGraph([(source, dag_node(2, OperatorType.SELECTION)), (source, dag_node(3, OperatorType.SELECTION))])
+    calls = []
+    stable_layout(G, {source: (0., 0.)}, lambda G: calls.append(G) or {n: (0., 0.) for n in G})
+    assert len(calls) == 1
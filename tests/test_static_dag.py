@@ -0,0 +1,38 @@
+import pytest
+
+from mlinspect_demo.util.static_dag import StaticOperatorType, extract_static_dag
+
+
+PIPELINE = """
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+patients = pd.read_csv("patients.csv")
+histories = pd.read_csv("histories.csv")
+data = patients.merge(histories, on=["ssn"])
+data = data[data["age"] > 20]
+data = data[["age", "income"]]
+train, test = train_test_split(data)
+"""
+
+
+def test_operators_and_edges_are_extracted():
+    G = extract_static_dag(PIPELINE)
+    nodes = sorted(G, key=lambda node: node.node_id)
+    assert [node.operator_type for node in nodes] == [
+        StaticOperatorType.DATA_SOURCE, StaticOperatorType.DATA_SOURCE, StaticOperatorType.JOIN,
+        StaticOperatorType.SELECTION, StaticOperatorType.PROJECTION, StaticOperatorType.TRAIN_TEST_SPLIT,
+    ]
+    assert [node.code_reference.lineno for node in nodes] == [5, 6, 7, 8, 9, 10]
+    assert set(G.predecessors(nodes[2])) == {nodes[0], nodes[1]}
+    assert list(G.predecessors(nodes[5])) == [nodes[4]]
+
+
+def test_unknown_code_has_no_operators():
+    assert not extract_static_dag("a = 1\nprint(a)\n")
+
+
+@pytest.mark.parametrize("pipeline", ["a = (", "a = 1\0"])
+def test_invalid_code_raises(pipeline):
+    with pytest.raises((SyntaxError, ValueError)):
+        extract_static_dag(pipeline)
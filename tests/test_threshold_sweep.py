@@ -0,0 +1,55 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from mlinspect_demo.util.threshold_sweep import sweep_no_bias_thresholds, threshold_grid
+
+
+CheckResult = namedtuple("CheckResult", ["bias_distribution_change"])
+DistributionChange = namedtuple("DistributionChange", ["before_and_after_df"])
+
+
+def change(ratio_before, ratio_after, removal_probability):
+    return DistributionChange(pd.DataFrame({
+        "ratio_before": ratio_before,
+        "ratio_after": ratio_after,
+        "removal_probability": removal_probability,
+    }))
+
+
+def test_threshold_grid_converts_percent():
+    np.testing.assert_allclose(threshold_grid(-50, 50, num=3), [-0.5, 0., 0.5])
+
+
+def test_nodes_fail_for_thresholds_their_changes_exceed():
+    # Relative ratio change -0.5 and -0.2, probability ratio 4 and 1
+    check_result = CheckResult({
+        "a": {"race": change([0.5, 0.5], [0.25, 0.75], [0.8, 0.2])},
+        "b": {"race": change([0.5, 0.5], [0.4, 0.6], [0.1, 0.1])},
+    })
+    nodes, failures = sweep_no_bias_thresholds(check_result, [-0.6, -0.3, -0.1], [2., 5.])
+    assert nodes == ["a", "b"]
+    assert failures.shape == (2, 3, 2)
+    np.testing.assert_array_equal(failures[0], [[True, False], [True, True], [True, True]])
+    np.testing.assert_array_equal(failures[1], [[False, False], [False, False], [True, True]])
+
+
+def test_a_node_fails_if_any_column_fails():
+    check_result = CheckResult({
+        "a": {"race": change([0.5, 0.5], [0.5, 0.5], [0.1, 0.1]),
+              "age": change([0.5, 0.5], [0.1, 0.9], [0.1, 0.1])},
+    })
+    nodes, failures = sweep_no_bias_thresholds(check_result, [-0.3], [2.])
+    assert failures[0, 0, 0]
+
+
+def test_values_that_did_not_occur_before_do_not_fail():
+    check_result = CheckResult({"a": {"race": change([0., 1.], [0.5, 0.5], [np.nan, 0.1])}})
+    nodes, failures = sweep_no_bias_thresholds(check_result, [-0.6], [2.])
+    assert not failures.any()
+
+
+def test_without_distribution_changes():
+    nodes, failures = sweep_no_bias_thresholds(CheckResult({"a": {"race": change([], [], [])}}), [0.], [1.])
+    assert nodes == [] and failures.shape == (0, 1, 1)